@@ -1,53 +1,116 @@
 import os
 import logging
-from flask import Flask
-from flask_cors import CORS
-from werkzeug.middleware.proxy_fix import ProxyFix
+from flask import Flask, render_template, jsonify, request
+from config import Config
+from utils.compression import ResponseCompressor
+from utils.json_provider import configure_json
+from utils.logging_config import configure_logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Create the Flask app
-app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+# Endpoints that call the Groq API and count toward tenant request usage
+UPSTREAM_ENDPOINTS = frozenset({
+    'chat.chat',
+    'chat.vision_chat',
+    'chat.vision_batch',
+    'upload.upload_file',
+    'upload.upload_batch',
+    'upload.analyze_content'
+})
 
-# Enable CORS for all routes
-CORS(app)
 
-# Import and register blueprints
-from routes.chat import chat_bp
-from routes.upload import upload_bp
+def create_app() -> Flask:
+    """Application factory: configure logging, build the app and register blueprints."""
+    configure_logging(
+        log_format=Config.LOG_FORMAT,
+        level=Config.LOG_LEVEL,
+        module_levels=Config.LOG_MODULE_LEVELS,
+        debug_sample_rate=Config.LOG_DEBUG_SAMPLE_RATE,
+        queue_size=Config.LOG_QUEUE_SIZE
+    )
 
-app.register_blueprint(chat_bp)
-app.register_blueprint(upload_bp)
+    from flask_cors import CORS
+    from werkzeug.middleware.proxy_fix import ProxyFix
 
-# Import main routes
-from flask import render_template, jsonify
+    # Create the Flask app
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
-@app.route('/')
-def index():
-    """Render the API documentation page."""
-    return render_template('index.html')
+    # Enable CORS for all routes
+    CORS(app)
 
-@app.route('/health')
-def health():
-    """Health check endpoint."""
-    return jsonify({"status": "healthy", "message": "Chatbot API is running"})
+    json_provider = configure_json(app, Config.JSON_PROVIDER)
+    logger.debug("Using %s JSON provider", json_provider)
 
-@app.errorhandler(400)
-def bad_request(error):
-    return jsonify({"error": "Bad request", "message": str(error)}), 400
+    compressor = ResponseCompressor(
+        min_size=Config.COMPRESSION_MIN_SIZE,
+        gzip_level=Config.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=Config.COMPRESSION_BROTLI_QUALITY
+    ) if Config.COMPRESSION_ENABLED else None
 
-@app.errorhandler(401)
-def unauthorized(error):
-    return jsonify({"error": "Unauthorized", "message": "Invalid API key"}), 401
+    # Import and register blueprints
+    from routes.chat import chat_bp
+    from routes.upload import upload_bp
+    from routes.admin import admin_bp
+    from services.admission import admission_controller
+    from services.precompute import precompute_service
+    from services.tenants import current_tenant, resolve_tenant, usage_tracker
+
+    app.register_blueprint(chat_bp)
+    app.register_blueprint(upload_bp)
+    app.register_blueprint(admin_bp)
+
+    @app.before_request
+    def identify_tenant():
+        """Attribute the request to a tenant for fair scheduling and usage accounting."""
+        tenant = resolve_tenant(request.headers)
+        current_tenant.set(tenant)
+        if request.endpoint in UPSTREAM_ENDPOINTS:
+            usage_tracker.record_request(tenant)
+
+    if compressor is not None:
+        @app.after_request
+        def compress_response(response):
+            """Compress large responses when the client accepts gzip or brotli."""
+            return compressor(request, response)
+
+    @app.route('/')
+    def index():
+        """Render the API documentation page."""
+        return render_template('index.html')
+
+    @app.route('/health')
+    def health():
+        """Health check endpoint."""
+        return jsonify({
+            "status": "healthy",
+            "message": "Chatbot API is running",
+            "admission": admission_controller.snapshot() if Config.ADMISSION_ENABLED else None,
+            "precompute": precompute_service.stats() if Config.PRECOMPUTE_ENABLED else None,
+            "json_provider": json_provider,
+            "compression": compressor.stats.snapshot() if compressor is not None else None
+        })
+
+    @app.errorhandler(400)
+    def bad_request(error):
+        return jsonify({"error": "Bad request", "message": str(error)}), 400
+
+    @app.errorhandler(401)
+    def unauthorized(error):
+        return jsonify({"error": "Unauthorized", "message": "Invalid API key"}), 401
+
+    @app.errorhandler(413)
+    def request_too_large(error):
+        return jsonify({"error": "Request too large", "message": "Upload exceeds the maximum allowed size"}), 413
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        logger.error("Internal server error: %s", error)
+        return jsonify({"error": "Internal server error", "message": "Something went wrong"}), 500
+
+    return app
 
-@app.errorhandler(500)
-def internal_error(error):
-    logger.error(f"Internal server error: {error}")
-    return jsonify({"error": "Internal server error", "message": "Something went wrong"}), 500
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    create_app().run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,247 @@
+"""
+End-to-end load benchmark against a local mock of the Groq API.
+
+Starts the mock upstream and the Flask app in-process, drives the public
+endpoints at a controlled concurrency and reports throughput, latency
+percentiles and memory. Results are saved as JSON for regression comparison.
+
+Memory is the resident size of this one process, so it includes the mock
+upstream and the client threads as well as the app. Per scenario,
+``rss_peak_mb``/``rss_growth_mb`` come from sampling during that scenario
+only; ``process_peak_rss_mb`` is the running maximum since startup and
+carries over from earlier scenarios.
+
+Usage:
+    python -m benchmarks.e2e --requests 50 --concurrency 8
+    python -m benchmarks.e2e --scenarios chat_basic,upload_large --latency-ms 500
+    python -m benchmarks.e2e --compare benchmarks/results/e2e-20250101-120000.json
+    python -m benchmarks.e2e --replay upstream_traffic.jsonl.gz --replay-mode inprocess
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import requests
+
+from benchmarks import fixtures
+from benchmarks.mock_groq import add_mock_arguments, settings_from_args, start_mock_server
+from benchmarks.stats import (RssSampler, compare, environment_info, load_results, peak_rss_mb,
+                              print_comparison, save_results, summarize)
+
+_thread_state = threading.local()
+
+
+def _session() -> requests.Session:
+    session = getattr(_thread_state, "session", None)
+    if session is None:
+        session = requests.Session()
+        _thread_state.session = session
+    return session
+
+
+def build_scenarios(base_url: str) -> Dict[str, Callable[[], requests.Response]]:
+    """Map scenario name to a callable issuing one request."""
+    question = "¿Cuáles son las ventajas de usar caché en una API?"
+    analyze_content = fixtures.make_text(4000, seed=1)
+    pdfs = {
+        "small": fixtures.make_pdf(2, seed=1),
+        "medium": fixtures.make_pdf(20, seed=2),
+        "large": fixtures.make_pdf(100, seed=3),
+    }
+    image = fixtures.make_png(256, 256, seed=1)
+
+    def chat(mode: str) -> Callable[[], requests.Response]:
+        def run():
+            return _session().post(f"{base_url}/chat", json={
+                "message": question,
+                "model": "llama3-8b",
+                "mode": mode,
+                "conversation_history": [
+                    {"role": "user", "content": "Hola"},
+                    {"role": "assistant", "content": "Hola, ¿en qué puedo ayudarte?"}
+                ]
+            })
+        return run
+
+    def analyze():
+        return _session().post(f"{base_url}/analyze", json={
+            "content": analyze_content[:50000],
+            "question": "Resume los puntos principales",
+            "model": "llama3-8b"
+        })
+
+    def upload(size: str) -> Callable[[], requests.Response]:
+        def run():
+            return _session().post(
+                f"{base_url}/upload",
+                files={"file": (f"doc-{size}.pdf", pdfs[size], "application/pdf")},
+                data={"process_with_ai": "true", "model": "mixtral"}
+            )
+        return run
+
+    def vision():
+        return _session().post(
+            f"{base_url}/chat/vision",
+            files={"image": ("sample.png", image, "image/png")},
+            data={"message": "Describe la imagen"}
+        )
+
+    return {
+        "chat_basic": chat("basic"),
+        "chat_pro": chat("pro"),
+        "analyze": analyze,
+        "upload_small": upload("small"),
+        "upload_medium": upload("medium"),
+        "upload_large": upload("large"),
+        "vision": vision,
+    }
+
+
+def warm_up(call: Callable[[], requests.Response], count: int) -> int:
+    """Send unmeasured requests and return how many of them failed."""
+    failures = 0
+    for _ in range(count):
+        try:
+            if call().status_code != 200:
+                failures += 1
+        except requests.RequestException:
+            failures += 1
+    return failures
+
+
+def run_scenario(call: Callable[[], requests.Response], total: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    status_counts: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            status = str(call().status_code)
+        except requests.RequestException as e:
+            status = type(e).__name__
+        elapsed = (time.perf_counter() - start) * 1000.0
+        with lock:
+            latencies.append(elapsed)
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    sampler = RssSampler().start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+    memory = sampler.stop()
+
+    summary = summarize(latencies)
+    summary.update({
+        "concurrency": concurrency,
+        "throughput_rps": total / wall if wall else 0.0,
+        "wall_s": wall,
+        "status_counts": status_counts,
+        "errors": sum(count for status, count in status_counts.items() if status != "200"),
+        **memory,
+        "process_peak_rss_mb": peak_rss_mb(),
+    })
+    return summary
+
+
+def start_app(upstream_url: str):
+    """Import the Flask app pointed at the mock upstream and serve it on a thread."""
+    os.environ["GROQ_API_URL"] = upstream_url
+    os.environ.setdefault("GROQ_API_KEY", "gsk_benchmark_mock_key_000000")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_MODULE_LEVELS", "werkzeug=WARNING")
+
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    app = create_app()
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="bench-app", daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against a mock Groq upstream")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", default="", help="Comma-separated subset of scenarios")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per scenario")
+    parser.add_argument("--output", default=None, help="Result file path")
+    parser.add_argument("--compare", default=None, help="Previous result file to compare against")
+    parser.add_argument("--metric", default="p95_ms")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    parser.add_argument("--replay-mode", choices=["server", "inprocess"], default="server",
+                        help="Replay the --replay log from the stand-in server or inside GroqClient")
+    add_mock_arguments(parser)
+    args = parser.parse_args(argv)
+
+    replay_log = args.replay
+    if args.replay and args.replay_mode == "inprocess":
+        # GroqClient serves the log itself; the stand-in server stays synthetic and unused
+        os.environ["UPSTREAM_TRAFFIC_MODE"] = "replay"
+        os.environ["UPSTREAM_TRAFFIC_LOG"] = args.replay
+        os.environ["UPSTREAM_REPLAY_SPEED"] = str(args.replay_speed)
+        args.replay = None
+    mock_settings = settings_from_args(args)
+    mock_server, upstream_url = start_mock_server(mock_settings)
+    app_server, base_url = start_app(upstream_url)
+
+    scenarios = build_scenarios(base_url)
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()] or list(scenarios)
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        parser.error(f"Unknown scenarios: {unknown}. Available: {list(scenarios)}")
+
+    results = {}
+    try:
+        for name in selected:
+            warmup_errors = warm_up(scenarios[name], args.warmup)
+            summary = run_scenario(scenarios[name], args.requests, args.concurrency)
+            # Kept apart from "errors" so the measured error rate only covers measured requests
+            summary["warmup_errors"] = warmup_errors
+            results[name] = summary
+            print(f"{name:<16} {summary['throughput_rps']:>8.1f} req/s  "
+                  f"p50 {summary['p50_ms']:>8.1f} ms  p95 {summary['p95_ms']:>8.1f} ms  "
+                  f"p99 {summary['p99_ms']:>8.1f} ms  errors {summary['errors']}"
+                  + (f"  rss +{summary['rss_growth_mb']:.1f} MB" if summary["rss_growth_mb"] is not None else "")
+                  + (f"  warmup errors {warmup_errors}" if warmup_errors else ""))
+    finally:
+        app_server.shutdown()
+        mock_server.shutdown()
+
+    document = {
+        "kind": "e2e",
+        "environment": environment_info(),
+        "settings": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "mock_latency_ms": args.latency_ms,
+            "mock_jitter_ms": args.jitter_ms,
+            "mock_distribution": args.distribution,
+            "mock_rate_limit_rate": args.rate_limit_rate,
+            "mock_error_rate": args.error_rate,
+            "replay": replay_log,
+            "replay_mode": args.replay_mode if replay_log else None,
+        },
+        "upstream": dict(mock_settings.stats),
+        "results": results,
+    }
+    path = save_results(document, "e2e", args.output)
+    print(f"\nResults saved to {path}")
+
+    if args.compare:
+        rows = compare(results, load_results(args.compare)["results"], args.metric, args.threshold)
+        print_comparison(rows, args.metric)
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Generated fixtures shared by the benchmark scripts (no external dependencies)."""
+import random
+import struct
+import zlib
+from typing import List
+
+_WORDS = (
+    "análisis datos modelo respuesta documento contexto sistema usuario "
+    "rendimiento latencia proceso archivo texto página resultado prueba "
+    "the quick brown fox jumps over lazy dog performance throughput request"
+).split()
+
+
+def make_text(word_count: int, seed: int = 0, line_words: int = 12) -> str:
+    """Generate pseudo-random multilingual text with ``word_count`` words."""
+    rng = random.Random(seed)
+    lines = []
+    for start in range(0, word_count, line_words):
+        count = min(line_words, word_count - start)
+        lines.append(" ".join(rng.choice(_WORDS) for _ in range(count)))
+    return "\n".join(lines)
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: int, lines_per_page: int = 40, seed: int = 0) -> bytes:
+    """
+    Build a minimal text PDF with ``pages`` pages.
+
+    Pages with ``lines_per_page=0`` have an empty content stream and no text
+    layer, so extraction yields nothing. They carry no image either, so they
+    measure the per-page parsing overhead of a scanned document, not its
+    image decoding.
+    """
+    rng = random.Random(seed)
+    objects: List[bytes] = []
+
+    page_ids = [3 + i * 2 for i in range(pages)]
+    font_id = 3 + pages * 2
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+
+    for pid in page_ids:
+        lines = []
+        for _ in range(lines_per_page):
+            # PDF base fonts use Latin-1 style encoding; keep ASCII only
+            words = [rng.choice(_WORDS).encode("ascii", "ignore").decode() for _ in range(10)]
+            lines.append(f"({_pdf_escape(' '.join(words))}) Tj T*")
+        stream = ("BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(lines) + " ET").encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {pid + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(out)
+
+
+def make_png(width: int, height: int, seed: int = 0) -> bytes:
+    """Build an RGB PNG filled with noise so it does not compress to nothing."""
+    rng = random.Random(seed)
+    row_size = width * 3
+    raw = bytearray()
+    for _ in range(height):
+        raw.append(0)  # filter type: none
+        raw += rng.randbytes(row_size)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(bytes(raw), 6)) + chunk(b"IEND", b""))
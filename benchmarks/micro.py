@@ -0,0 +1,306 @@
+"""
+Micro-benchmarks for the CPU-bound hot paths.
+
+Covers PDF and text extraction in ``FileProcessor``, word counting, image
+base64 encoding, message assembly for basic and pro mode, semantic cache
+lookups, JSON encoding/decoding and response compression. Fixtures are
+generated in memory, each benchmark is auto-calibrated so one sample takes
+at least ``--min-time`` seconds, and results can be stored as a baseline
+and checked against it.
+
+``micro_baseline.json`` is committed from a reference machine (see its
+``environment`` block). Timings only compare on the same hardware, so CI
+should run ``--save-baseline`` on the target branch and then ``--check``
+on the change, on the same runner.
+
+Usage:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter pdf --repeat 15
+    python -m benchmarks.micro --save-baseline
+    python -m benchmarks.micro --check --threshold 15
+"""
+import argparse
+import gc
+import io
+import logging
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks import fixtures
+from benchmarks.stats import (compare, environment_info, load_results, print_comparison,
+                              save_results, summarize)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "micro_baseline.json")
+
+# Each factory returns the zero-argument callable to time
+Benchmark = Tuple[str, Callable[[], Callable[[], object]]]
+
+
+def _pdf_benchmark(pages: int, lines_per_page: int) -> Callable[[], Callable[[], object]]:
+    def factory():
+        from services.file_processor import FileProcessor
+        data = fixtures.make_pdf(pages, lines_per_page=lines_per_page, seed=pages)
+
+        def run():
+            try:
+                return FileProcessor._extract_pdf_text(io.BytesIO(data))
+            except ValueError:
+                # Pages without a text layer have nothing to extract
+                return None
+        return run
+    return factory
+
+
+def _text_benchmark(word_count: int) -> Callable[[], Callable[[], object]]:
+    def factory():
+        from services.file_processor import FileProcessor
+        data = fixtures.make_text(word_count, seed=word_count).encode("utf-8")
+
+        def run():
+            return FileProcessor._extract_text_content(io.BytesIO(data))
+        return run
+    return factory
+
+
+def _word_count_benchmark(word_count: int) -> Callable[[], Callable[[], object]]:
+    def factory():
+        from services.file_processor import FileProcessor
+        text = fixtures.make_text(word_count, seed=word_count)
+
+        def run():
+            return FileProcessor.count_words(text)
+        return run
+    return factory
+
+
+def _base64_benchmark(width: int, height: int) -> Callable[[], Callable[[], object]]:
+    def factory():
+        from services.file_processor import FileProcessor
+        image = fixtures.make_png(width, height, seed=width)
+
+        def run():
+            return FileProcessor.encode_image_data_url(image, "image/png")
+        return run
+    return factory
+
+
+def _payload_benchmark(context_words: int, history_turns: int) -> Callable[[], Callable[[], object]]:
+    def factory():
+        from services.groq_client import GroqClient
+        context = fixtures.make_text(context_words, seed=3)
+        history = []
+        for turn in range(history_turns):
+            history.append({"role": "user", "content": fixtures.make_text(40, seed=turn)})
+            history.append({"role": "assistant", "content": fixtures.make_text(120, seed=turn + 1)})
+
+        def run():
+            return GroqClient.build_chat_payload(
+                "¿Cuál es la idea principal?",
+                model="llama3-8b",
+                context=context,
+                conversation_history=history
+            )
+        return run
+    return factory
+
+
+def _pro_mode_benchmark(context_words: int) -> Callable[[], Callable[[], object]]:
+    def factory():
+        from services.groq_client import GroqClient
+
+        canned = {
+            "choices": [{"message": {"content": fixtures.make_text(300, seed=9)}, "finish_reason": "stop"}],
+            "usage": {"total_tokens": 1}
+        }
+
+        class OfflineGroqClient(GroqClient):
+            """Skips the network so only prompt and message assembly is measured."""
+
+            def _make_request(self, payload):
+                return canned
+
+        client = OfflineGroqClient()
+        context = fixtures.make_text(context_words, seed=4)
+        history = [
+            {"role": "user", "content": fixtures.make_text(60, seed=5)},
+            {"role": "assistant", "content": fixtures.make_text(200, seed=6)},
+        ] * 3
+
+        def run():
+            return client.pro_mode_completion(
+                "Explica las implicaciones",
+                model="llama3-8b",
+                context=context,
+                conversation_history=history
+            )
+        return run
+    return factory
+
+
+def _semantic_cache_benchmark(entries: int) -> Callable[[], Callable[[], object]]:
+    def factory():
+        from services.semantic_cache import SemanticCache
+        cache = SemanticCache(max_entries=entries)
+        for i in range(entries):
+            cache.store("llama3-8b", "ctx", fixtures.make_text(12, seed=i), {"content": str(i)})
+        questions = [fixtures.make_text(12, seed=i * 7) for i in range(64)]
+        position = [0]
+
+        def run():
+            position[0] = (position[0] + 1) % len(questions)
+            return cache.lookup("llama3-8b", "ctx", questions[position[0]])
+        return run
+    return factory
+
+
+def _chat_response_document(history_turns: int) -> Dict:
+    history = []
+    for turn in range(history_turns):
+        history.append({"role": "user", "content": fixtures.make_text(40, seed=turn)})
+        history.append({"role": "assistant", "content": fixtures.make_text(120, seed=turn + 1)})
+    return {
+        "success": True,
+        "response": fixtures.make_text(600, seed=7),
+        "model": "llama3-70b",
+        "usage": {"prompt_tokens": 5000, "completion_tokens": 800, "total_tokens": 5800},
+        "conversation_history": history,
+        "metadata": {"routing": {"candidates": ["llama3-70b", "mixtral"], "attempts": [{"model": "llama3-70b", "outcome": "ok"}]}}
+    }
+
+
+def _json_benchmark(provider: str) -> Callable[[], Callable[[], object]]:
+    def factory():
+        from flask import Flask
+        from utils.json_provider import configure_json
+        app = Flask(__name__)
+        configure_json(app, provider)
+        document = _chat_response_document(20)
+
+        def run():
+            return app.json.loads(app.json.dumps(document))
+        return run
+    return factory
+
+
+def _gzip_benchmark(history_turns: int) -> Callable[[], Callable[[], object]]:
+    def factory():
+        import json
+        from utils.compression import ResponseCompressor
+        compressor = ResponseCompressor()
+        data = json.dumps(_chat_response_document(history_turns)).encode("utf-8")
+
+        def run():
+            return compressor._compress("gzip", data)
+        return run
+    return factory
+
+
+BENCHMARKS: List[Benchmark] = [
+    ("pdf_text_1p", _pdf_benchmark(1, 40)),
+    ("pdf_text_10p", _pdf_benchmark(10, 40)),
+    ("pdf_text_50p", _pdf_benchmark(50, 40)),
+    ("pdf_dense_10p", _pdf_benchmark(10, 120)),
+    ("pdf_no_text_20p", _pdf_benchmark(20, 0)),
+    ("text_utf8_100k_words", _text_benchmark(100_000)),
+    ("text_utf8_1m_words", _text_benchmark(1_000_000)),
+    ("word_count_100k", _word_count_benchmark(100_000)),
+    ("word_count_1m", _word_count_benchmark(1_000_000)),
+    ("base64_image_256", _base64_benchmark(256, 256)),
+    ("base64_image_1024", _base64_benchmark(1024, 1024)),
+    ("payload_basic_small", _payload_benchmark(200, 2)),
+    ("payload_basic_large", _payload_benchmark(6000, 20)),
+    ("payload_pro_mode", _pro_mode_benchmark(2000)),
+    ("semantic_cache_lookup_2k", _semantic_cache_benchmark(2048)),
+    ("json_roundtrip_std", _json_benchmark("std")),
+    ("json_roundtrip_fast", _json_benchmark("auto")),
+    ("gzip_chat_response", _gzip_benchmark(20)),
+]
+
+
+def calibrate(func: Callable[[], object], min_time: float) -> int:
+    """Find a loop count so one sample takes at least ``min_time`` seconds."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1_000_000:
+            return loops
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+
+def measure(func: Callable[[], object], repeat: int, min_time: float) -> Dict:
+    """Time ``func`` and return per-call statistics in milliseconds."""
+    func()  # warm caches and lazy imports
+    loops = calibrate(func, min_time)
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                func()
+            samples.append((time.perf_counter() - start) * 1000.0 / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    summary = summarize(samples)
+    summary["loops"] = loops
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for FileProcessor and payload construction")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=9, help="Samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per sample")
+    parser.add_argument("--output", default=None, help="Result file path")
+    # Saving overwrites the baseline before the comparison, so a combined run would check against itself
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save-baseline", action="store_true", help=f"Write results to {BASELINE_PATH}")
+    mode.add_argument("--check", action="store_true", help="Compare against the baseline file")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--metric", default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args(argv)
+
+    # Swallow expected extraction errors instead of printing them via logging.lastResort
+    logging.getLogger().addHandler(logging.NullHandler())
+
+    results = {}
+    for name, factory in BENCHMARKS:
+        if args.filter and args.filter not in name:
+            continue
+        summary = measure(factory(), args.repeat, args.min_time)
+        results[name] = summary
+        print(f"{name:<24} median {summary['p50_ms']:>10.4f} ms  "
+              f"stdev {summary['stdev_ms']:>9.4f} ms  min {summary['min_ms']:>10.4f} ms  "
+              f"({summary['loops']} loops x {summary['count']})")
+
+    document = {
+        "kind": "micro",
+        "environment": environment_info(),
+        "settings": {"repeat": args.repeat, "min_time": args.min_time},
+        "results": results,
+    }
+    path = save_results(document, "micro", args.baseline if args.save_baseline else args.output)
+    print(f"\nResults saved to {path}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"Baseline file not found: {args.baseline}")
+            return 2
+        rows = compare(results, load_results(args.baseline)["results"], args.metric, args.threshold)
+        print_comparison(rows, args.metric)
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
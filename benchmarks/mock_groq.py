@@ -0,0 +1,307 @@
+"""
+Local stand-in for the Groq chat-completions endpoint.
+
+Serves OpenAI-compatible responses with a configurable latency distribution,
+optional streaming (server-sent events), and injected 429 / 5xx errors, so
+the Flask app can be exercised without calling the paid API. With
+``--replay`` it instead serves a recorded traffic log (see
+``UPSTREAM_TRAFFIC_MODE=record``) with the recorded statuses and latencies.
+
+Run standalone:
+    python -m benchmarks.mock_groq --port 8099 --latency-ms 300 --jitter-ms 100
+    python -m benchmarks.mock_groq --port 8099 --replay upstream_traffic.jsonl.gz
+
+Then point the app at it:
+    GROQ_API_URL=http://127.0.0.1:8099/openai/v1/chat/completions
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from utils.traffic_log import BAD_RESPONSE, CONNECTION_ERROR, NO_RESPONSE, TrafficReplay
+
+logger = logging.getLogger(__name__)
+
+CHAT_PATH = "/openai/v1/chat/completions"
+
+
+@dataclass
+class MockSettings:
+    latency_ms: float = 200.0
+    jitter_ms: float = 50.0
+    distribution: str = "normal"  # fixed | uniform | normal | lognormal
+    rate_limit_rate: float = 0.0
+    error_rate: float = 0.0
+    response_words: int = 120
+    stream_chunk_words: int = 8
+    retry_after_s: int = 1
+    seed: Optional[int] = None
+    replay_path: Optional[str] = None
+    replay_speed: float = 1.0
+    replay_key: Optional[str] = None
+    stats: Dict[str, int] = field(default_factory=lambda: {
+        "requests": 0, "rate_limited": 0, "errors": 0, "streamed": 0
+    })
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self.replay = (TrafficReplay(self.replay_path, self.replay_key, self.replay_speed)
+                       if self.replay_path else None)
+
+    def sample_latency(self) -> float:
+        """Return a latency in seconds drawn from the configured distribution."""
+        with self._lock:
+            if self.distribution == "fixed":
+                value = self.latency_ms
+            elif self.distribution == "uniform":
+                value = self._rng.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+            elif self.distribution == "lognormal":
+                # Median equals latency_ms; jitter controls the tail
+                sigma = self.jitter_ms / self.latency_ms if self.latency_ms else 0.0
+                value = self.latency_ms * self._rng.lognormvariate(0.0, sigma)
+            else:
+                value = self._rng.gauss(self.latency_ms, self.jitter_ms)
+        return max(0.0, value) / 1000.0
+
+    def roll(self) -> str:
+        """Decide the outcome of a request: 'ok', 'rate_limited' or 'error'."""
+        with self._lock:
+            self.stats["requests"] += 1
+            value = self._rng.random()
+            if value < self.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return "rate_limited"
+            if value < self.rate_limit_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return "error"
+            return "ok"
+
+
+def _estimate_tokens(messages) -> int:
+    chars = 0
+    for message in messages or []:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            for part in content:
+                chars += len(part.get("text", "")) if part.get("type") == "text" else 1000
+        else:
+            chars += len(content)
+    return max(1, chars // 4)
+
+
+def _completion_text(words: int) -> str:
+    return " ".join(f"palabra{i % 50}" for i in range(words))
+
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    settings: MockSettings = MockSettings()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("mock_groq: " + format, *args)
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON"}})
+            return
+
+        if self.path.rstrip("/") != CHAT_PATH:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        settings = self.settings
+        if settings.replay is not None:
+            self._replay(payload)
+            return
+
+        time.sleep(settings.sample_latency())
+
+        outcome = settings.roll()
+        if outcome == "rate_limited":
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                            {"Retry-After": str(settings.retry_after_s)})
+            return
+        if outcome == "error":
+            self._send_json(500, {"error": {"message": "Internal upstream error"}})
+            return
+
+        prompt_tokens = _estimate_tokens(payload.get("messages"))
+        max_tokens = payload.get("max_tokens") or settings.response_words
+        words = min(settings.response_words, max_tokens)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": words,
+            "total_tokens": prompt_tokens + words
+        }
+
+        if payload.get("stream"):
+            self._stream(payload, words, usage)
+            return
+
+        self._send_json(200, {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": _completion_text(words)},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+
+    def _replay(self, payload: Dict) -> None:
+        settings = self.settings
+        entry = settings.replay.match(payload)
+        time.sleep(settings.replay.delay_s(entry))
+
+        status = entry["status"]
+        with settings._lock:
+            settings.stats["requests"] += 1
+            if status == 429:
+                settings.stats["rate_limited"] += 1
+            elif status != 200:
+                settings.stats["errors"] += 1
+
+        if status in (NO_RESPONSE, CONNECTION_ERROR):
+            # Recorded timeout (after the recorded wait) or connection error: drop the connection unanswered
+            self.close_connection = True
+            return
+        if status == BAD_RESPONSE:
+            # Recorded 200 whose body did not parse: answer with a truncated body
+            data = b'{"choices": ['
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        if status == 429:
+            retry_after = entry.get("retry_after") or settings.retry_after_s
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                            {"Retry-After": str(int(retry_after))})
+            return
+        if status >= 400:
+            self._send_json(status, {"error": {"message": "Replayed upstream error"}})
+            return
+        self._send_json(200, TrafficReplay.response_body(entry, payload))
+
+    def _stream(self, payload: Dict, words: int, usage: Dict) -> None:
+        settings = self.settings
+        with settings._lock:
+            settings.stats["streamed"] += 1
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        text_words = _completion_text(words).split()
+        step = max(1, settings.stream_chunk_words)
+        for start in range(0, len(text_words), step):
+            delta = " ".join(text_words[start:start + step]) + " "
+            event = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "model": payload.get("model"),
+                "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        final = {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion.chunk",
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"usage": usage}
+        }
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+def start_mock_server(settings: Optional[MockSettings] = None,
+                      host: str = "127.0.0.1",
+                      port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the mock server on a background thread and return it with its URL."""
+    handler = type("BoundMockGroqHandler", (MockGroqHandler,), {"settings": settings or MockSettings()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="mock-groq", daemon=True)
+    thread.start()
+    url = f"http://{host}:{server.server_address[1]}{CHAT_PATH}"
+    return server, url
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "normal", "lognormal"], default="normal")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--response-words", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--replay", default=None, help="Serve this recorded traffic log instead of synthetic responses")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Scale recorded latencies")
+    parser.add_argument("--replay-key", default=os.getenv("UPSTREAM_TRAFFIC_KEY"),
+                        help="Key the log was recorded with (default: UPSTREAM_TRAFFIC_KEY)")
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    return MockSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        distribution=args.distribution,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        response_words=args.response_words,
+        seed=args.seed,
+        replay_path=args.replay,
+        replay_speed=args.replay_speed,
+        replay_key=args.replay_key
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Groq chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server, url = start_mock_server(settings_from_args(args), host=args.host, port=args.port)
+    print(f"Mock Groq listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
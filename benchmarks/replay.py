@@ -0,0 +1,84 @@
+"""
+Inspect and compare recorded upstream traffic logs.
+
+Record a log by running the app with ``UPSTREAM_TRAFFIC_MODE=record``
+(written to ``UPSTREAM_TRAFFIC_LOG``). Replay it offline with
+``python -m benchmarks.e2e --replay LOG`` (stand-in server) or
+``--replay-mode inprocess`` (served by ``GroqClient`` itself).
+
+Usage:
+    python -m benchmarks.replay summary upstream_traffic.jsonl.gz
+    python -m benchmarks.replay diff monday.jsonl.gz tuesday.jsonl.gz --metric p99_ms
+"""
+import argparse
+import sys
+from typing import Dict, List
+
+from benchmarks.stats import compare, print_comparison, summarize
+from utils.traffic_log import read_log
+
+
+def latency_by_model(entries: List[Dict]) -> Dict[str, Dict]:
+    """Latency summary per model plus an ``all`` row, with status counts."""
+    samples: Dict[str, List[float]] = {"all": []}
+    statuses: Dict[str, Dict[str, int]] = {"all": {}}
+    for entry in entries:
+        for name in ("all", entry.get("model") or "unknown"):
+            counts = statuses.setdefault(name, {})
+            status = str(entry.get("status"))
+            counts[status] = counts.get(status, 0) + 1
+            if entry.get("latency_ms") is not None:
+                samples.setdefault(name, []).append(entry["latency_ms"])
+
+    results = {}
+    for name, values in samples.items():
+        summary = summarize(values)
+        summary["status_counts"] = statuses.get(name, {})
+        results[name] = summary
+    return results
+
+
+def print_summary(path: str) -> Dict[str, Dict]:
+    header, entries = read_log(path)
+    results = latency_by_model(entries)
+    # Workers sharing a log interleave their members, so entries are not in time order
+    duration = max(e["t"] for e in entries) - min(e["t"] for e in entries) if entries else 0.0
+    print(f"{path}: {len(entries)} exchanges over {duration:.1f} s (format v{header.get('version', '?')})")
+    for name, summary in results.items():
+        if not summary.get("count"):
+            continue
+        print(f"{name:<44} n {summary['count']:>6}  p50 {summary['p50_ms']:>8.1f} ms  "
+              f"p95 {summary['p95_ms']:>8.1f} ms  p99 {summary['p99_ms']:>8.1f} ms  "
+              f"statuses {summary['status_counts']}")
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize and diff upstream traffic logs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    summary_parser = commands.add_parser("summary", help="Latency percentiles per model")
+    summary_parser.add_argument("log")
+
+    diff_parser = commands.add_parser("diff", help="Compare latency percentiles of two logs")
+    diff_parser.add_argument("baseline")
+    diff_parser.add_argument("current")
+    diff_parser.add_argument("--metric", default="p95_ms")
+    diff_parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "summary":
+        print_summary(args.log)
+        return 0
+
+    baseline = print_summary(args.baseline)
+    print()
+    current = print_summary(args.current)
+    rows = compare(current, baseline, args.metric, args.threshold)
+    print_comparison(rows, args.metric)
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
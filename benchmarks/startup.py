@@ -0,0 +1,116 @@
+"""
+Cold-start benchmark: time to import the app and build it with ``create_app``.
+
+Each sample runs in a fresh interpreter, as a scale-to-zero container would
+on its first request. Reports process wall time, in-process import and
+factory time, and optionally the slowest modules from ``-X importtime``.
+
+Usage:
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --importtime 15
+    python -m benchmarks.startup --compare benchmarks/results/startup-20250101-120000.json
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.stats import (compare, environment_info, load_results, print_comparison,
+                              save_results, summarize)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+built = time.perf_counter()
+client = app.test_client()
+client.get('/health')
+served = time.perf_counter()
+print((imported - started) * 1000, (built - imported) * 1000, (served - built) * 1000)
+"""
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("LOG_LEVEL", "WARNING")
+    return env
+
+
+def run_probe() -> Tuple[float, float, float, float]:
+    """Return (process wall ms, import ms, create_app ms, first request ms)."""
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=PROJECT_ROOT, env=_child_env(), capture_output=True, text=True, check=True
+    ).stdout
+    wall = (time.perf_counter() - started) * 1000
+    import_ms, build_ms, first_ms = (float(value) for value in output.split())
+    return wall, import_ms, build_ms, first_ms
+
+
+def slowest_imports(limit: int) -> List[Tuple[int, str]]:
+    """Top modules by cumulative import time (microseconds) from ``-X importtime``."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from app import create_app; create_app()"],
+        cwd=PROJECT_ROOT, env=_child_env(), capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the Flask app")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--importtime", type=int, default=0, help="Show the N slowest imports")
+    parser.add_argument("--output", default=None, help="Result file path")
+    parser.add_argument("--compare", default=None, help="Previous result file to compare against")
+    parser.add_argument("--metric", default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args(argv)
+
+    run_probe()  # populate bytecode caches so every sample starts equally warm on disk
+    samples = {"process_wall": [], "import_app": [], "create_app": [], "first_request": []}
+    for _ in range(args.runs):
+        for name, value in zip(samples, run_probe()):
+            samples[name].append(value)
+
+    results = {name: summarize(values) for name, values in samples.items()}
+    for name, summary in results.items():
+        print(f"{name:<16} median {summary['p50_ms']:>8.1f} ms  "
+              f"p95 {summary['p95_ms']:>8.1f} ms  min {summary['min_ms']:>8.1f} ms")
+
+    if args.importtime:
+        print("\nSlowest imports (cumulative):")
+        for cumulative, name in slowest_imports(args.importtime):
+            print(f"{cumulative / 1000:>9.1f} ms  {name}")
+
+    document = {
+        "kind": "startup",
+        "environment": environment_info(),
+        "settings": {"runs": args.runs},
+        "results": results,
+    }
+    path = save_results(document, "startup", args.output)
+    print(f"\nResults saved to {path}")
+
+    if args.compare:
+        rows = compare(results, load_results(args.compare)["results"], args.metric, args.threshold)
+        print_comparison(rows, args.metric)
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
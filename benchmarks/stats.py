@@ -0,0 +1,162 @@
+"""Statistics and result-file helpers shared by the benchmark scripts."""
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (``pct`` in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """Summary statistics for a list of timings in milliseconds."""
+    if not samples_ms:
+        return {"count": 0}
+    return {
+        "count": len(samples_ms),
+        "mean_ms": statistics.fmean(samples_ms),
+        "stdev_ms": statistics.stdev(samples_ms) if len(samples_ms) > 1 else 0.0,
+        "min_ms": min(samples_ms),
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "max_ms": max(samples_ms),
+    }
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB (Linux only)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class RssSampler:
+    """
+    Polls ``current_rss_mb`` on a background thread between ``start`` and
+    ``stop`` to get the peak and growth of one measurement window, which
+    the process-wide ``peak_rss_mb`` cannot give.
+    """
+
+    def __init__(self, interval_s: float = 0.05):
+        self.interval_s = interval_s
+        self.start_mb: Optional[float] = None
+        self.peak_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        value = current_rss_mb()
+        if value is not None and (self.peak_mb is None or value > self.peak_mb):
+            self.peak_mb = value
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def start(self) -> "RssSampler":
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict[str, Optional[float]]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+        end_mb = current_rss_mb()
+        return {
+            "rss_start_mb": self.start_mb,
+            "rss_end_mb": end_mb,
+            "rss_peak_mb": self.peak_mb,
+            "rss_growth_mb": self.peak_mb - self.start_mb if self.start_mb is not None else None,
+        }
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB since it started, when the platform exposes it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    divisor = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    return peak / divisor
+
+
+def environment_info() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(results: Dict, prefix: str, path: Optional[str] = None) -> str:
+    """Write results as JSON; defaults to ``benchmarks/results/<prefix>-<timestamp>.json``."""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+    return path
+
+
+def load_results(path: str) -> Dict:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def compare(current: Dict[str, Dict], baseline: Dict[str, Dict],
+            metric: str = "p95_ms", threshold_pct: float = 10.0) -> List[Dict]:
+    """
+    Compare ``metric`` between two ``{name: summary}`` maps.
+
+    Returns one row per benchmark present in both, flagging rows whose value
+    grew by more than ``threshold_pct`` percent.
+    """
+    rows = []
+    for name, summary in current.items():
+        if name not in baseline or metric not in summary or metric not in baseline[name]:
+            continue
+        old = baseline[name][metric]
+        new = summary[metric]
+        change = ((new - old) / old * 100.0) if old else 0.0
+        rows.append({
+            "name": name,
+            "baseline": old,
+            "current": new,
+            "change_pct": change,
+            "regression": change > threshold_pct,
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict], metric: str) -> None:
+    print(f"\n{'benchmark':<32} {'baseline':>12} {'current':>12} {'change':>9}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:<32} {row['baseline']:>12.3f} {row['current']:>12.3f} "
+              f"{row['change_pct']:>+8.1f}%{flag}")
+    print(f"(metric: {metric})")
@@ -1,10 +1,11 @@
 import os
+from types import MappingProxyType
 
 
 class Config:
     # Groq API configuration
     GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-    GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+    GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
 
     # Available models with their descriptions
     AVAILABLE_MODELS = {
@@ -12,37 +13,49 @@ class Config:
             'id': 'llama3-8b-8192',
             'name': 'Llama 3 8B',
             'description': 'Fast and efficient for general tasks',
-            'context_window': 8192
+            'context_window': 8192,
+            'quality': 1,
+            'expected_latency_ms': 600
         },
         'llama3-70b': {
             'id': 'llama3-70b-8192',
             'name': 'Llama 3 70B',
             'description': 'Most capable model for complex reasoning',
-            'context_window': 8192
+            'context_window': 8192,
+            'quality': 3,
+            'expected_latency_ms': 1500
         },
         'mixtral': {
             'id': 'mixtral-8x7b-32768',
             'name': 'Mixtral 8x7B',
             'description': 'Excellent for long context tasks',
-            'context_window': 32768
+            'context_window': 32768,
+            'quality': 2,
+            'expected_latency_ms': 1000
         },
         'gemma': {
             'id': 'gemma-7b-it',
             'name': 'Gemma 7B',
             'description': 'Google\'s efficient instruction-tuned model',
-            'context_window': 8192
+            'context_window': 8192,
+            'quality': 1,
+            'expected_latency_ms': 600
         },
         'gpt-oss-20b': {
             'id': 'openai/gpt-oss-20b',
             'name': 'GPT-OSS 20B',
             'description': 'OpenAI\'s Como ChatGPT rapido',
-            'context_window': 131072
+            'context_window': 131072,
+            'quality': 3,
+            'expected_latency_ms': 1000
         },
         'gpt-oss-120b': {
             'id': 'openai/gpt-oss-120b',
             'name': 'GPT-OSS 20B',
             'description': 'OpenAI\'s Como ChatGPT Potente',
-            'context_window': 131072
+            'context_window': 131072,
+            'quality': 4,
+            'expected_latency_ms': 2500
         }
     }
 
@@ -51,16 +64,125 @@ class Config:
         'meta-llama/llama-4-scout-17b-16e-instruct': {
             'name': 'Meta llama 4',
             'description': 'Advanced vision-language model for image analysis',
-            'context_window': 8192
+            'context_window': 8192,
+            'max_images': 5,  # Images per request accepted by the API
+            'max_payload_bytes': 4 * 1024 * 1024  # Base64 image data per request
         }
     }
 
     # Default model
     DEFAULT_MODEL = "llama3-8b"
 
+    # Automatic model routing ("model": "auto")
+    AUTO_MODEL = "auto"
+    # Minimum model quality preferred for each routing tier
+    ROUTING_TIERS = {
+        'fast': 1,
+        'balanced': 2,
+        'quality': 4
+    }
+    DEFAULT_ROUTING_TIER = "balanced"
+    ROUTING_LATENCY_SMOOTHING = 0.2  # EWMA weight of the newest latency sample
+    ROUTING_RATE_LIMIT_COOLDOWN = 30  # Seconds to deprioritize a rate-limited model
+
+    # Pre-built immutable lookups so request handlers don't rebuild them per call
+    MODEL_KEYS = tuple(AVAILABLE_MODELS)
+    MODEL_IDS = MappingProxyType({key: info['id'] for key, info in AVAILABLE_MODELS.items()})
+    SELECTABLE_MODELS = frozenset(AVAILABLE_MODELS) | {AUTO_MODEL}
+    VISION_MODEL_KEYS = tuple(VISION_MODELS)
+
     # File processing settings
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-    ALLOWED_EXTENSIONS = {'txt', 'pdf'}
+    ALLOWED_EXTENSIONS = frozenset({'txt', 'pdf'})
+    MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
+    ALLOWED_IMAGE_TYPES = frozenset({'image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp'})
+    VISION_BATCH_MAX_PROMPTS = int(os.getenv("VISION_BATCH_MAX_PROMPTS", "20"))
+    VISION_BATCH_MAX_TOTAL_SIZE = int(os.getenv("VISION_BATCH_MAX_TOTAL_SIZE", str(50 * 1024 * 1024)))  # 50MB
+    BATCH_UPLOAD_MAX_FILES = int(os.getenv("BATCH_UPLOAD_MAX_FILES", "20"))
+    BATCH_UPLOAD_MAX_TOTAL_SIZE = int(os.getenv("BATCH_UPLOAD_MAX_TOTAL_SIZE", str(50 * 1024 * 1024)))  # 50MB
+    MULTIPART_OVERHEAD = 256 * 1024  # Room for boundaries and form fields on top of the file bytes
+    UPLOAD_READ_CHUNK_SIZE = 64 * 1024
+    # Used for non-UTF-8 text files when the charset cannot be detected
+    TEXT_FALLBACK_ENCODING = os.getenv("TEXT_FALLBACK_ENCODING", "cp1252")
+
+    # Worker pools
+    EXTRACTION_EXECUTOR = os.getenv("EXTRACTION_EXECUTOR", "process")  # "process" or "thread"
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+    IO_WORKERS = int(os.getenv("IO_WORKERS", "16"))  # Concurrent upstream calls from batch endpoints
+
+    # Retrieval over uploaded documents
+    RETRIEVAL_CHUNK_CHARS = int(os.getenv("RETRIEVAL_CHUNK_CHARS", "2000"))
+    RETRIEVAL_CONTEXT_CHARS = int(os.getenv("RETRIEVAL_CONTEXT_CHARS", "16000"))  # ~4k tokens
 
     # Pro mode settings
-    PRO_MODE_QUERIES = 3  # Number of queries for synthesis in pro mode
+    PRO_MODE_QUERIES = int(os.getenv("PRO_MODE_QUERIES", "3"))  # Number of queries for synthesis in pro mode
+    PRO_MODE_MAX_QUERIES = 5  # Number of available perspective prompts
+    # Model for the perspective calls (empty = same as the synthesis model)
+    PRO_MODE_PERSPECTIVE_MODEL = os.getenv("PRO_MODE_PERSPECTIVE_MODEL", "")
+    # Skip the synthesis call once perspectives are at least this similar (0-1,
+    # Jaccard of content terms). Paraphrases of one answer score about 0.4-0.5,
+    # different answers on the same topic 0.1-0.3 (see tests/test_pro_mode.py)
+    PRO_MODE_AGREEMENT_THRESHOLD = float(os.getenv("PRO_MODE_AGREEMENT_THRESHOLD", "0.35"))
+
+    # Near-duplicate question cache in front of chat completions
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))  # Shingle Jaccard 0-1
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2048"))
+    SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))  # Seconds before an answer goes stale
+
+    # JSON serialization ("auto" uses orjson when installed, "std" forces the stdlib)
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+
+    # Response compression negotiated via Accept-Encoding (brotli if installed, else gzip)
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+    # Background summary/outline precompute after uploads (opt-in)
+    PRECOMPUTE_ENABLED = os.getenv("PRECOMPUTE_ENABLED", "false").lower() == "true"
+    PRECOMPUTE_MODEL = os.getenv("PRECOMPUTE_MODEL", "llama3-8b")
+    PRECOMPUTE_WORKERS = int(os.getenv("PRECOMPUTE_WORKERS", "2"))
+    PRECOMPUTE_QUEUE_SIZE = int(os.getenv("PRECOMPUTE_QUEUE_SIZE", "32"))
+    PRECOMPUTE_MAX_ENTRIES = int(os.getenv("PRECOMPUTE_MAX_ENTRIES", "256"))
+    # Only start a job while the model's admission saturation is below this (0-1)
+    PRECOMPUTE_MAX_SATURATION = float(os.getenv("PRECOMPUTE_MAX_SATURATION", "0.5"))
+
+    # Admission control for upstream Groq calls (per model, AIMD-adapted limits)
+    ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", "16"))
+    ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+    ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "64"))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))  # Waiting calls per model
+    ADMISSION_MAX_QUEUE_WAIT = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT", "5"))  # Seconds
+    ADMISSION_LATENCY_TARGET_MS = float(os.getenv("ADMISSION_LATENCY_TARGET_MS", "8000"))
+    ADMISSION_DECREASE_FACTOR = 0.7
+
+    # Tenant identification, fair scheduling and usage accounting
+    # Tenants are a hash of X-API-Key / Bearer token; X-Tenant-ID is only
+    # honoured from a trusted proxy that also sends X-Tenant-Secret
+    TENANT_HEADER = "X-Tenant-ID"
+    TENANT_SECRET_HEADER = "X-Tenant-Secret"
+    TENANT_PROXY_SECRET = os.getenv("TENANT_PROXY_SECRET", "")
+    TENANT_WEIGHTS = os.getenv("TENANT_WEIGHTS", "")  # e.g. "acme=2,key-1a2b3c4d5e6f7a8b=0.5"
+    # Distinct tenants tracked per process (configured ones excluded); the rest share one bucket
+    TENANT_MAX_TRACKED = int(os.getenv("TENANT_MAX_TRACKED", "1000"))
+    USAGE_DB_PATH = os.getenv("USAGE_DB_PATH", "usage.db")
+    USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", "30"))  # Seconds between SQLite flushes
+    ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")  # Required in X-Admin-Key for /admin endpoints
+
+    # Upstream traffic capture for offline load tests: "" (off), "record" or "replay"
+    UPSTREAM_TRAFFIC_MODE = os.getenv("UPSTREAM_TRAFFIC_MODE", "").lower()
+    UPSTREAM_TRAFFIC_LOG = os.getenv("UPSTREAM_TRAFFIC_LOG", "upstream_traffic.jsonl.gz")
+    UPSTREAM_TRAFFIC_KEY = os.getenv("UPSTREAM_TRAFFIC_KEY", "")  # HMAC key for fingerprints; never written to the log
+    UPSTREAM_TRAFFIC_FLUSH_RECORDS = int(os.getenv("UPSTREAM_TRAFFIC_FLUSH_RECORDS", "20"))  # Records per gzip member
+    UPSTREAM_REPLAY_SPEED = float(os.getenv("UPSTREAM_REPLAY_SPEED", "1.0"))  # Scales recorded latencies
+
+    # Logging settings
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
+    # Per-module overrides, e.g. "services.groq_client=INFO,urllib3=WARNING"
+    LOG_MODULE_LEVELS = os.getenv("LOG_MODULE_LEVELS", "")
+    # Fraction of DEBUG records kept per message (1.0 keeps all)
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
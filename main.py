@@ -1,5 +1,7 @@
 import os
-from app import app
+from app import create_app
+
+app = create_app()
 
 if __name__ == '__main__':
     # Obtener el puerto de la variable de entorno PORT, por defecto 8080 si no está definida
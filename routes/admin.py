@@ -0,0 +1,36 @@
+import hmac
+import logging
+from flask import Blueprint, request, jsonify, abort
+from config import Config
+from services.admission import admission_controller
+from services.tenants import usage_tracker
+
+logger = logging.getLogger(__name__)
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+@admin_bp.before_request
+def require_admin_key():
+    """Reject admin requests without the configured admin key."""
+    provided = request.headers.get('X-Admin-Key', '')
+    if not Config.ADMIN_API_KEY or not hmac.compare_digest(provided, Config.ADMIN_API_KEY):
+        logger.warning("Rejected admin request to %s", request.path)
+        abort(401)
+
+@admin_bp.route('/usage', methods=['GET'])
+def get_usage():
+    """
+    Per-tenant request and token usage.
+
+    Query parameters:
+    - tenant: Only return this tenant (optional)
+    - flush: "true" to write pending counters to the database first (optional)
+    """
+    if request.args.get('flush', '').lower() == 'true':
+        usage_tracker.flush()
+
+    return jsonify({
+        "success": True,
+        "usage": usage_tracker.snapshot(request.args.get('tenant')),
+        "scheduling": admission_controller.snapshot() if Config.ADMISSION_ENABLED else None
+    })
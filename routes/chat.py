@@ -1,8 +1,15 @@
+import time
 import logging
-from flask import Blueprint, request, jsonify
-from services.groq_client import GroqClient
+from typing import Dict, List
+from flask import Blueprint, current_app, request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+from config import Config
+from services.admission import AdmissionRejected
+from services.groq_client import GroqClient, RateLimitError
+from services.model_router import model_router
+from services.file_processor import FileProcessor
 from utils.validators import RequestValidator
-import base64
+from utils.responses import rate_limited_response, service_overloaded_response
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +23,13 @@ def chat():
     Expected JSON payload:
     {
         "message": "Your message here",
-        "model": "llama3-8b" (optional),
+        "model": "llama3-8b" | "auto" (optional),
         "mode": "basic|pro" (optional),
-        "context": "Additional context" (optional)
+        "context": "Additional context" (optional),
+        "tier": "fast|balanced|quality" (optional, with model "auto"),
+        "latency_slo_ms": 2000 (optional, with model "auto"),
+        "perspectives": 1-5 (optional, pro mode),
+        "perspective_model": "llama3-8b" (optional, pro mode)
     }
     """
     try:
@@ -48,20 +59,26 @@ def chat():
 
         # Generate response based on mode
         if validated_data['mode'] == 'pro':
-            logger.info(f"Processing pro mode request with model: {validated_data['model']}")
+            logger.info("Processing pro mode request with model: %s", validated_data['model'])
             response = groq_client.pro_mode_completion(
                 message=validated_data['message'],
                 model=validated_data['model'],
                 context=validated_data['context'],
-                conversation_history=conversation_history
+                conversation_history=conversation_history,
+                routing_tier=validated_data['tier'],
+                latency_slo_ms=validated_data['latency_slo_ms'],
+                perspectives=validated_data['perspectives'],
+                perspective_model=validated_data['perspective_model']
             )
         else:
-            logger.info(f"Processing basic mode request with model: {validated_data['model']}")
+            logger.info("Processing basic mode request with model: %s", validated_data['model'])
             response = groq_client.chat_completion(
                 message=validated_data['message'],
                 model=validated_data['model'],
                 context=validated_data['context'],
-                conversation_history=conversation_history
+                conversation_history=conversation_history,
+                routing_tier=validated_data['tier'],
+                latency_slo_ms=validated_data['latency_slo_ms']
             )
 
         # Build response
@@ -73,22 +90,33 @@ def chat():
             "usage": response.get("usage", {}),
             "metadata": {
                 "finish_reason": response.get("finish_reason"),
-                "perspectives_analyzed": response.get("perspectives_analyzed")
+                "perspectives_analyzed": response.get("perspectives_analyzed"),
+                "synthesis_skipped": response.get("synthesis_skipped"),
+                "agreement": response.get("agreement"),
+                "timings": response.get("timings"),
+                "routing": response.get("routing"),
+                "cache": response.get("cache")
             }
         }
 
-        logger.info(f"Chat request completed successfully with model: {validated_data['model']}")
+        logger.info("Chat request completed successfully with model: %s", response["model"])
         return jsonify(result)
 
     except ValueError as e:
-        logger.warning(f"Validation error: {e}")
+        logger.warning("Validation error: %s", e)
         return jsonify({
             "error": "Validation error",
             "message": str(e)
         }), 400
 
+    except RateLimitError as e:
+        return rate_limited_response(e)
+
+    except AdmissionRejected as e:
+        return service_overloaded_response(e)
+
     except Exception as e:
-        logger.error(f"Chat processing error: {e}")
+        logger.error("Chat processing error: %s", e)
         return jsonify({
             "error": "Processing error",
             "message": "Failed to process chat request"
@@ -97,12 +125,13 @@ def chat():
 @chat_bp.route('/models', methods=['GET'])
 def get_models():
     """Get available AI models."""
-    from config import Config
-
     return jsonify({
         "success": True,
         "models": Config.AVAILABLE_MODELS,
-        "default_model": Config.DEFAULT_MODEL
+        "default_model": Config.DEFAULT_MODEL,
+        "auto_model": Config.AUTO_MODEL,
+        "routing_tiers": list(Config.ROUTING_TIERS.keys()),
+        "observed_latency_ms": model_router.latency_snapshot()
     })
 
 @chat_bp.route('/chat/vision', methods=['POST'])
@@ -111,9 +140,10 @@ def vision_chat():
     Handle chat requests with image analysis using vision models.
 
     Form data:
-    - image: The image file to analyze
-    - message: User's message/question about the image
-    - model: Vision model to use (optional, defaults to llava-v1.5-7b-4096-preview)
+    - image: The image file(s) to analyze; repeat the field (or use "images")
+      to send several images in one message, up to the model's limit
+    - message: User's message/question about the image(s)
+    - model: Vision model to use (optional, defaults to llama-4-scout)
     """
     try:
         # Validate API key
@@ -124,80 +154,48 @@ def vision_chat():
             }), 500
 
         # Check if image is present
-        if 'image' not in request.files:
+        image_files = request.files.getlist('image') + request.files.getlist('images')
+        if not image_files:
             return jsonify({
                 "error": "No image provided",
                 "message": "Please upload an image"
             }), 400
 
-        image_file = request.files['image']
-        if image_file.filename == '':
-            return jsonify({
-                "error": "No image selected",
-                "message": "Please select an image file"
-            }), 400
-
-        # Validate image type
-        allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp']
-        if image_file.content_type not in allowed_types:
-            return jsonify({
-                "error": "Invalid image type",
-                "message": "Supported formats: JPEG, PNG, GIF, WebP"
-            }), 400
-
-        # Check file size (max 10MB)
-        image_file.seek(0, 2)  # Seek to end
-        file_size = image_file.tell()
-        image_file.seek(0)  # Reset to beginning
-
-        if file_size > 10 * 1024 * 1024:
-            return jsonify({
-                "error": "Image too large",
-                "message": "Image size cannot exceed 10MB"
-            }), 400
-
         # Get message and model
         message = request.form.get('message', 'Describe what you see in this image').strip()
         model = request.form.get('model', 'meta-llama/llama-4-scout-17b-16e-instruct')
 
         # Validate model (ensure it's a vision model)
-        from config import Config
-        vision_models = list(Config.VISION_MODELS.keys())
-        if model not in vision_models:
+        if model not in Config.VISION_MODELS:
             return jsonify({
                 "error": "Invalid vision model",
-                "message": f"Available vision models: {vision_models}"
+                "message": f"Available vision models: {list(Config.VISION_MODEL_KEYS)}"
             }), 400
 
-        # Convert image to base64
-        image_data = image_file.read()
-        image_base64 = base64.b64encode(image_data).decode('utf-8')
-
-        # Determine image format for data URL
-        content_type = image_file.content_type
-        
-        # Ensure proper image format for Groq
-        if content_type in ['image/jpeg', 'image/jpg']:
-            mime_type = 'image/jpeg'
-        elif content_type == 'image/png':
-            mime_type = 'image/png'
-        elif content_type == 'image/gif':
-            mime_type = 'image/gif'
-        elif content_type == 'image/webp':
-            mime_type = 'image/webp'
-        else:
-            mime_type = 'image/jpeg'  # Default fallback
-            
-        image_url = f"data:{mime_type};base64,{image_base64}"
+        limits = Config.VISION_MODELS[model]
+        if len(image_files) > limits['max_images']:
+            return jsonify({
+                "error": "Too many images",
+                "message": f"{model} accepts at most {limits['max_images']} images per request; use /chat/vision/batch for independent prompts"
+            }), 400
+
+        # Validate and convert images to base64 data URLs
+        images = [FileProcessor.prepare_image(image_file) for image_file in image_files]
+        payload_bytes = sum(image["encoded_bytes"] for image in images)
+        if payload_bytes > limits['max_payload_bytes']:
+            return jsonify({
+                "error": "Images too large",
+                "message": f"Encoded images exceed {limits['max_payload_bytes'] // (1024*1024)}MB per request"
+            }), 400
 
-        logger.info(f"Processing vision request with model: {model}, image type: {mime_type}")
+        logger.info("Processing vision request with model: %s, images: %s", model, len(images))
 
-        # Generate AI response with image
+        # Generate AI response with the images packed into one message
         groq_client = GroqClient()
         ai_response = groq_client.vision_completion(
             message=message,
-            image_url=image_url,
-            model=model
+            model=model,
+            image_urls=[image["data_url"] for image in images]
         )
 
         result = {
@@ -208,25 +206,183 @@ def vision_chat():
             "usage": ai_response.get("usage", {}),
             "metadata": {
                 "image_analyzed": True,
-                "image_size": file_size,
-                "image_type": content_type,
+                "images_analyzed": len(images),
+                "image_size": sum(image["size"] for image in images),
+                "image_type": images[0]["content_type"],
+                "payload_bytes": payload_bytes,
+                "images": [_image_metadata(image) for image in images],
                 "finish_reason": ai_response.get("finish_reason")
             }
         }
 
-        logger.info(f"Vision chat completed successfully with model: {model}")
+        logger.info("Vision chat completed successfully with model: %s", model)
         return jsonify(result)
 
     except ValueError as e:
-        logger.warning(f"Vision chat validation error: {e}")
+        logger.warning("Vision chat validation error: %s", e)
         return jsonify({
             "error": "Validation error",
             "message": str(e)
         }), 400
 
+    except RateLimitError as e:
+        return rate_limited_response(e)
+
+    except AdmissionRejected as e:
+        return service_overloaded_response(e)
+
     except Exception as e:
-        logger.error(f"Vision chat processing error: {e}")
+        logger.error("Vision chat processing error: %s", e)
         return jsonify({
             "error": "Vision processing error",
             "message": "Failed to process image analysis request"
-        }), 500
\ No newline at end of file
+        }), 500
+
+@chat_bp.route('/chat/vision/batch', methods=['POST'])
+def vision_batch():
+    """
+    Analyze several images as independent prompts, concurrently.
+
+    Form data:
+    - images: The image files; each one becomes its own prompt
+    - message: Prompt applied to every image (optional)
+    - messages: JSON array of per-image prompts, by position (optional)
+    - model: Vision model to use (optional)
+    """
+    # Enforce the combined size budget while werkzeug streams the multipart body
+    request.max_content_length = Config.VISION_BATCH_MAX_TOTAL_SIZE + Config.MULTIPART_OVERHEAD
+
+    try:
+        # Validate API key
+        if not RequestValidator.validate_groq_api_key():
+            return jsonify({
+                "error": "Configuration error",
+                "message": "Groq API key not configured"
+            }), 500
+
+        image_files = request.files.getlist('images')
+        if not image_files:
+            return jsonify({
+                "error": "No images provided",
+                "message": "Please upload one or more images in the 'images' field"
+            }), 400
+
+        if len(image_files) > Config.VISION_BATCH_MAX_PROMPTS:
+            return jsonify({
+                "error": "Too many images",
+                "message": f"A batch cannot contain more than {Config.VISION_BATCH_MAX_PROMPTS} images"
+            }), 400
+
+        model = request.form.get('model', 'meta-llama/llama-4-scout-17b-16e-instruct')
+        if model not in Config.VISION_MODELS:
+            return jsonify({
+                "error": "Invalid vision model",
+                "message": f"Available vision models: {list(Config.VISION_MODEL_KEYS)}"
+            }), 400
+
+        default_message = request.form.get('message', 'Describe what you see in this image').strip()
+        try:
+            messages = current_app.json.loads(request.form.get('messages') or '[]')
+        except ValueError:
+            messages = None
+        if not isinstance(messages, list) or not all(isinstance(item, str) for item in messages):
+            raise ValueError("messages must be a JSON array of strings")
+
+        max_payload_bytes = Config.VISION_MODELS[model]['max_payload_bytes']
+        images = [FileProcessor.prepare_image(image_file) for image_file in image_files]
+        for image in images:
+            if image["encoded_bytes"] > max_payload_bytes:
+                raise ValueError(f"Encoded image {image['filename']} exceeds {max_payload_bytes // (1024*1024)}MB")
+
+        prompts = [
+            {
+                "message": (messages[index].strip() if index < len(messages) else "") or default_message,
+                "image_urls": [image["data_url"]]
+            }
+            for index, image in enumerate(images)
+        ]
+
+        logger.info("Processing vision batch with model: %s, prompts: %s", model, len(prompts))
+        started = time.perf_counter()
+        responses = GroqClient().vision_batch(prompts, model=model)
+
+        results = []
+        for prompt, image, response in zip(prompts, images, responses):
+            item = {
+                "success": response["success"],
+                "message": prompt["message"],
+                "image": _image_metadata(image),
+                "latency_ms": response["latency_ms"]
+            }
+            if response["success"]:
+                item.update({
+                    "response": response["content"],
+                    "usage": response.get("usage", {}),
+                    "finish_reason": response.get("finish_reason")
+                })
+            else:
+                item["error"] = response["error"]
+                if "retry_after" in response:
+                    item["retry_after"] = response["retry_after"]
+            results.append(item)
+
+        if not any(response["success"] for response in responses):
+            return _batch_failed_response(responses)
+
+        return jsonify({
+            "success": any(item["success"] for item in results),
+            "model": model,
+            "mode": "vision_batch",
+            "results": results,
+            "usage": GroqClient._sum_usage([item.get("usage", {}) for item in results]),
+            "metadata": {
+                "prompts": len(results),
+                "succeeded": sum(1 for item in results if item["success"]),
+                "payload_bytes": sum(image["encoded_bytes"] for image in images),
+                "preprocess_ms": round(sum(image["preprocess_ms"] for image in images), 3),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
+        })
+
+    except RequestEntityTooLarge:
+        raise
+
+    except ValueError as e:
+        logger.warning("Vision batch validation error: %s", e)
+        return jsonify({
+            "error": "Validation error",
+            "message": str(e)
+        }), 400
+
+    except Exception as e:
+        logger.error("Vision batch processing error: %s", e)
+        return jsonify({
+            "error": "Vision processing error",
+            "message": "Failed to process image batch"
+        }), 500
+
+def _batch_failed_response(responses: List[Dict]):
+    """Map a batch where every prompt failed to the status a single request would get."""
+    error_types = {response["error_type"] for response in responses}
+    retry_after = max((response.get("retry_after") or 0 for response in responses), default=0) or None
+    message = responses[0]["error"] if len(responses) == 1 else f"All {len(responses)} prompts failed: {responses[0]['error']}"
+    if error_types == {"rate_limited"}:
+        return rate_limited_response(RateLimitError(message, retry_after))
+    if error_types <= {"rate_limited", "overloaded"}:
+        return service_overloaded_response(AdmissionRejected(message, retry_after or 1.0))
+    logger.error("Vision batch failed for every prompt: %s", message)
+    return jsonify({
+        "error": "Upstream error",
+        "message": "Failed to analyze any image in the batch"
+    }), 502
+
+
+def _image_metadata(image: Dict) -> Dict:
+    """Per-image preprocessing details reported alongside vision responses."""
+    return {
+        "filename": image["filename"],
+        "content_type": image["content_type"],
+        "size": image["size"],
+        "encoded_bytes": image["encoded_bytes"],
+        "preprocess_ms": image["preprocess_ms"]
+    }
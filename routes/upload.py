@@ -1,13 +1,27 @@
+import io
+import time
 import logging
-from flask import Blueprint, request, jsonify
+from concurrent.futures import as_completed
+from typing import Dict, List, Optional, Tuple
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+from config import Config
 from services.file_processor import FileProcessor
-from services.groq_client import GroqClient
+from services.precompute import SUMMARY_PROMPT, precompute_service
+from services.retrieval import build_context, context_budget
+from services.worker_pool import cpu_executor
+from services.admission import AdmissionRejected
+from services.groq_client import GroqClient, RateLimitError
 from utils.validators import RequestValidator
+from utils.responses import rate_limited_response, service_overloaded_response
 
 logger = logging.getLogger(__name__)
 
 upload_bp = Blueprint('upload', __name__)
 
+_ZERO_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
 @upload_bp.route('/upload', methods=['POST'])
 def upload_file():
     """
@@ -16,8 +30,9 @@ def upload_file():
     Form data:
     - file: The uploaded file (PDF or TXT)
     - process_with_ai: "true" to process with AI (optional)
-    - model: AI model to use (optional)
+    - model: AI model to use, or "auto" (optional)
     - question: Question about the file content (optional)
+    - tier, latency_slo_ms: Routing preferences for model "auto" (optional)
     """
     try:
         # Check if file is present
@@ -30,7 +45,7 @@ def upload_file():
         file = request.files['file']
         
         # Process the file
-        logger.info(f"Processing uploaded file: {file.filename}")
+        logger.info("Processing uploaded file: %s", file.filename)
         file_info = FileProcessor.process_file(file)
         
         # Check if AI processing is requested
@@ -42,9 +57,12 @@ def upload_file():
                 "filename": file_info["filename"],
                 "size": file_info["size"],
                 "type": file_info["type"],
-                "word_count": file_info["word_count"]
+                "word_count": file_info["word_count"],
+                "char_count": file_info["char_count"],
+                "line_count": file_info["line_count"],
+                "encoding": file_info["encoding"]
             },
-            "content_preview": file_info["content"][:500] + "..." if len(file_info["content"]) > 500 else file_info["content"]
+            "content_preview": file_info["preview"]
         }
         
         if process_with_ai:
@@ -60,54 +78,289 @@ def upload_file():
             question = request.form.get('question', '').strip()
             
             # Validate model
-            from config import Config
-            if model not in Config.AVAILABLE_MODELS:
+            if not RequestValidator.is_valid_model(model):
                 return jsonify({
                     "error": "Invalid model",
-                    "message": f"Available models: {list(Config.AVAILABLE_MODELS.keys())}"
+                    "message": f"Available models: {list(Config.MODEL_KEYS) + [Config.AUTO_MODEL]}"
                 }), 400
             
-            # Generate AI response
-            groq_client = GroqClient()
+            tier, latency_slo_ms, routing_errors = RequestValidator.parse_routing_options(request.form)
+            if routing_errors:
+                return jsonify({
+                    "error": "Invalid routing options",
+                    "message": "; ".join(routing_errors)
+                }), 400
             
-            if question:
-                # Answer specific question about the file
-                message = f"Based on the uploaded document, please answer: {question}"
-            else:
-                # Provide general summary
-                message = "Please provide a comprehensive summary and analysis of this document."
+            precomputed = None
+            if Config.PRECOMPUTE_ENABLED and not question:
+                precomputed = precompute_service.lookup(file_info["content"], model)
             
-            logger.info(f"Processing file with AI using model: {model}")
-            ai_response = groq_client.chat_completion(
-                message=message,
-                model=model,
-                context=file_info["content"]
-            )
-            
-            result["ai_analysis"] = {
-                "response": ai_response["content"],
-                "model": ai_response["model"],
-                "question": question if question else "General analysis",
-                "usage": ai_response.get("usage", {})
-            }
+            if precomputed:
+                logger.info("Serving precomputed summary for %s", file_info["filename"])
+                result["ai_analysis"] = _precomputed_analysis(precomputed)
+            else:
+                # Generate AI response
+                groq_client = GroqClient()
+                
+                if question:
+                    # Answer specific question about the file
+                    message = f"Based on the uploaded document, please answer: {question}"
+                else:
+                    # Provide general summary
+                    message = SUMMARY_PROMPT
+                
+                logger.info("Processing file with AI using model: %s", model)
+                ai_response = groq_client.chat_completion(
+                    message=message,
+                    model=model,
+                    context=file_info["content"],
+                    routing_tier=tier,
+                    latency_slo_ms=latency_slo_ms
+                )
+                
+                result["ai_analysis"] = {
+                    "response": ai_response["content"],
+                    "model": ai_response["model"],
+                    "question": question if question else "General analysis",
+                    "usage": ai_response.get("usage", {}),
+                    "routing": ai_response.get("routing"),
+                    "cache": ai_response.get("cache")
+                }
+                
+                if Config.PRECOMPUTE_ENABLED and not question:
+                    precompute_service.store(file_info["content"], ai_response)
         
-        logger.info(f"File upload processed successfully: {file_info['filename']}")
+        if Config.PRECOMPUTE_ENABLED and "ai_analysis" not in result:
+            # Warm up the summary most clients ask for next
+            result["precompute"] = precompute_service.submit(file_info["content"])
+        
+        logger.info("File upload processed successfully: %s", file_info['filename'])
         return jsonify(result)
         
     except ValueError as e:
-        logger.warning(f"File processing validation error: {e}")
+        logger.warning("File processing validation error: %s", e)
         return jsonify({
             "error": "File processing error",
             "message": str(e)
         }), 400
     
+    except RateLimitError as e:
+        return rate_limited_response(e)
+    
+    except AdmissionRejected as e:
+        return service_overloaded_response(e)
+    
     except Exception as e:
-        logger.error(f"File upload processing error: {e}")
+        logger.error("File upload processing error: %s", e)
         return jsonify({
             "error": "Upload processing error",
             "message": "Failed to process uploaded file"
         }), 500
 
+@upload_bp.route('/upload/batch', methods=['POST'])
+def upload_batch():
+    """
+    Upload several files at once and extract them in parallel.
+    
+    Form data:
+    - files: The uploaded files (PDF or TXT), repeated once per file
+    - question: Question answered across all documents (optional)
+    - model: AI model to use for the question, or "auto" (optional)
+    - tier, latency_slo_ms: Routing preferences for model "auto" (optional)
+    
+    Responds with NDJSON: one "file" line per document as soon as it has
+    been extracted, an "analysis" line when a question was asked, and a
+    final "summary" line.
+    """
+    # Enforce the combined size budget while werkzeug streams the multipart body
+    request.max_content_length = Config.BATCH_UPLOAD_MAX_TOTAL_SIZE + Config.MULTIPART_OVERHEAD
+    
+    try:
+        uploads = [upload for upload in request.files.getlist('files') if upload.filename]
+        if not uploads:
+            return jsonify({
+                "error": "No files provided",
+                "message": "Please upload one or more files in the 'files' field"
+            }), 400
+        
+        if len(uploads) > Config.BATCH_UPLOAD_MAX_FILES:
+            return jsonify({
+                "error": "Too many files",
+                "message": f"A batch cannot contain more than {Config.BATCH_UPLOAD_MAX_FILES} files"
+            }), 400
+        
+        question = request.form.get('question', '').strip()
+        model = request.form.get('model', 'llama3-8b')
+        tier, latency_slo_ms = None, None
+        
+        if question:
+            if not RequestValidator.validate_groq_api_key():
+                return jsonify({
+                    "error": "Configuration error",
+                    "message": "Groq API key not configured"
+                }), 500
+            
+            if not RequestValidator.is_valid_model(model):
+                return jsonify({
+                    "error": "Invalid model",
+                    "message": f"Available models: {list(Config.MODEL_KEYS) + [Config.AUTO_MODEL]}"
+                }), 400
+            
+            tier, latency_slo_ms, routing_errors = RequestValidator.parse_routing_options(request.form)
+            if routing_errors:
+                return jsonify({
+                    "error": "Invalid routing options",
+                    "message": "; ".join(routing_errors)
+                }), 400
+        
+        files = _read_uploads(uploads)
+        
+    except RequestEntityTooLarge:
+        raise
+    
+    except ValueError as e:
+        logger.warning("Batch upload validation error: %s", e)
+        return jsonify({
+            "error": "File processing error",
+            "message": str(e)
+        }), 400
+    
+    logger.info("Processing batch upload of %s files", len(files))
+    
+    def generate():
+        started = time.perf_counter()
+        documents = [None] * len(files)
+        futures = {
+            cpu_executor().submit(FileProcessor.process_bytes, filename, data): (index, filename)
+            for index, (filename, data, error) in enumerate(files)
+            if error is None
+        }
+        
+        for index, (filename, data, error) in enumerate(files):
+            if error is not None:
+                yield current_app.json.dumps(
+                    {"type": "file", "index": index, "filename": filename, "success": False, "error": error}
+                ) + "\n"
+        
+        for future in as_completed(futures):
+            index, filename = futures[future]
+            try:
+                file_info = future.result()
+                documents[index] = file_info
+                if Config.PRECOMPUTE_ENABLED:
+                    precompute_service.submit(file_info["content"])
+                line = {
+                    "type": "file",
+                    "index": index,
+                    "success": True,
+                    "file_info": {
+                        "filename": file_info["filename"],
+                        "size": file_info["size"],
+                        "type": file_info["type"],
+                        "word_count": file_info["word_count"],
+                        "char_count": file_info["char_count"],
+                        "line_count": file_info["line_count"],
+                        "encoding": file_info["encoding"]
+                    },
+                    "content_preview": file_info["preview"]
+                }
+            except ValueError as e:
+                line = {"type": "file", "index": index, "filename": filename, "success": False, "error": str(e)}
+            except Exception as e:
+                logger.error("Batch extraction failed for %s: %s", filename, e)
+                line = {"type": "file", "index": index, "filename": filename, "success": False,
+                        "error": "Failed to process uploaded file"}
+            yield current_app.json.dumps(line) + "\n"
+        
+        extracted = [document for document in documents if document]
+        if question:
+            yield current_app.json.dumps(
+                _analyze_documents(extracted, question, model, tier, latency_slo_ms)
+            ) + "\n"
+        
+        yield current_app.json.dumps({
+            "type": "summary",
+            "files": len(files),
+            "succeeded": len(extracted),
+            "failed": len(files) - len(extracted),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _read_uploads(uploads: List[FileStorage]) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+    """
+    Read uploads in chunks as ``(filename, data, error)``.
+
+    A file with a disallowed type or over ``MAX_FILE_SIZE`` gets an error
+    and no data, so the rest of the batch is still processed; exceeding the
+    combined size limit rejects the whole batch.
+    """
+    files = []
+    total = 0
+    for upload in uploads:
+        if not FileProcessor.allowed_file(upload.filename):
+            files.append((upload.filename, None, f"File type not allowed. Supported types: {', '.join(sorted(Config.ALLOWED_EXTENSIONS))}"))
+            continue
+        
+        buffer = io.BytesIO()
+        error = None
+        while True:
+            chunk = upload.stream.read(Config.UPLOAD_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > Config.BATCH_UPLOAD_MAX_TOTAL_SIZE:
+                raise ValueError(f"Batch too large. Maximum combined size: {Config.BATCH_UPLOAD_MAX_TOTAL_SIZE / (1024*1024):.1f}MB")
+            if buffer.tell() + len(chunk) > Config.MAX_FILE_SIZE:
+                error = f"File too large. Maximum size: {Config.MAX_FILE_SIZE / (1024*1024):.1f}MB"
+                break
+            buffer.write(chunk)
+        files.append((upload.filename, None if error else buffer.getvalue(), error))
+    return files
+
+def _analyze_documents(documents: List[Dict], question: str, model: str,
+                       tier: Optional[str], latency_slo_ms: Optional[float]) -> Dict:
+    """Answer one question across documents using the most relevant chunks."""
+    if not documents:
+        return {"type": "analysis", "success": False, "error": "No readable documents to analyze"}
+    
+    try:
+        context, sources = build_context(documents, question, context_budget(model))
+        ai_response = GroqClient().chat_completion(
+            message=f"Based on the uploaded documents, please answer: {question}",
+            model=model,
+            context=context,
+            routing_tier=tier,
+            latency_slo_ms=latency_slo_ms
+        )
+        return {
+            "type": "analysis",
+            "success": True,
+            "question": question,
+            "response": ai_response["content"],
+            "model": ai_response["model"],
+            "usage": ai_response.get("usage", {}),
+            "sources": sources,
+            "routing": ai_response.get("routing"),
+            "cache": ai_response.get("cache")
+        }
+    except (RateLimitError, AdmissionRejected) as e:
+        return {"type": "analysis", "success": False, "error": str(e), "retry_after": e.retry_after}
+    except Exception as e:
+        logger.error("Batch analysis error: %s", e)
+        return {"type": "analysis", "success": False, "error": "Failed to analyze documents"}
+
+def _precomputed_analysis(precomputed: Dict) -> Dict:
+    return {
+        "response": precomputed["summary"],
+        "model": precomputed["model"],
+        "question": "General analysis",
+        "usage": _ZERO_USAGE,
+        "outline": precomputed["outline"],
+        "precomputed": True
+    }
+
 @upload_bp.route('/analyze', methods=['POST'])
 def analyze_content():
     """
@@ -117,8 +370,12 @@ def analyze_content():
     {
         "content": "Text content to analyze",
         "question": "Specific question" (optional),
-        "model": "llama3-8b" (optional),
-        "mode": "basic|pro" (optional)
+        "model": "llama3-8b" | "auto" (optional),
+        "mode": "basic|pro" (optional),
+        "tier": "fast|balanced|quality" (optional, with model "auto"),
+        "latency_slo_ms": 2000 (optional, with model "auto"),
+        "perspectives": 1-5 (optional, pro mode),
+        "perspective_model": "llama3-8b" (optional, pro mode)
     }
     """
     try:
@@ -157,11 +414,24 @@ def analyze_content():
         mode = data.get('mode', 'basic')
         
         # Validate model
-        from config import Config
-        if model not in Config.AVAILABLE_MODELS:
+        if not RequestValidator.is_valid_model(model):
             return jsonify({
                 "error": "Invalid model",
-                "message": f"Available models: {list(Config.AVAILABLE_MODELS.keys())}"
+                "message": f"Available models: {list(Config.MODEL_KEYS) + [Config.AUTO_MODEL]}"
+            }), 400
+        
+        tier, latency_slo_ms, routing_errors = RequestValidator.parse_routing_options(data)
+        if routing_errors:
+            return jsonify({
+                "error": "Invalid routing options",
+                "message": "; ".join(routing_errors)
+            }), 400
+        
+        perspectives, perspective_model, pro_errors = RequestValidator.parse_pro_mode_options(data)
+        if pro_errors:
+            return jsonify({
+                "error": "Invalid pro mode options",
+                "message": "; ".join(pro_errors)
             }), 400
         
         if mode not in ['basic', 'pro']:
@@ -170,6 +440,25 @@ def analyze_content():
                 "message": "Mode must be either 'basic' or 'pro'"
             }), 400
         
+        if Config.PRECOMPUTE_ENABLED and not question and mode == 'basic':
+            precomputed = precompute_service.lookup(content, model)
+            if precomputed:
+                logger.info("Serving precomputed analysis for content")
+                return jsonify({
+                    "success": True,
+                    "analysis": precomputed["summary"],
+                    "model": precomputed["model"],
+                    "mode": mode,
+                    "question": "General analysis",
+                    "content_stats": {
+                        "character_count": len(content),
+                        "word_count": FileProcessor.count_words(content)
+                    },
+                    "usage": _ZERO_USAGE,
+                    "outline": precomputed["outline"],
+                    "metadata": {"precomputed": True}
+                })
+        
         # Prepare message
         if question:
             message = f"Based on the provided content, please answer: {question}"
@@ -180,18 +469,24 @@ def analyze_content():
         groq_client = GroqClient()
         
         if mode == 'pro':
-            logger.info(f"Analyzing content with pro mode using model: {model}")
+            logger.info("Analyzing content with pro mode using model: %s", model)
             ai_response = groq_client.pro_mode_completion(
                 message=message,
                 model=model,
-                context=content
+                context=content,
+                routing_tier=tier,
+                latency_slo_ms=latency_slo_ms,
+                perspectives=perspectives,
+                perspective_model=perspective_model
             )
         else:
-            logger.info(f"Analyzing content with basic mode using model: {model}")
+            logger.info("Analyzing content with basic mode using model: %s", model)
             ai_response = groq_client.chat_completion(
                 message=message,
                 model=model,
-                context=content
+                context=content,
+                routing_tier=tier,
+                latency_slo_ms=latency_slo_ms
             )
         
         result = {
@@ -202,21 +497,44 @@ def analyze_content():
             "question": question if question else "General analysis",
             "content_stats": {
                 "character_count": len(content),
-                "word_count": len(content.split())
+                "word_count": FileProcessor.count_words(content)
             },
             "usage": ai_response.get("usage", {}),
             "metadata": {
                 "finish_reason": ai_response.get("finish_reason"),
-                "perspectives_analyzed": ai_response.get("perspectives_analyzed")
+                "perspectives_analyzed": ai_response.get("perspectives_analyzed"),
+                "synthesis_skipped": ai_response.get("synthesis_skipped"),
+                "agreement": ai_response.get("agreement"),
+                "timings": ai_response.get("timings"),
+                "routing": ai_response.get("routing"),
+                "cache": ai_response.get("cache")
             }
         }
         
-        logger.info(f"Content analysis completed successfully with model: {model}")
+        logger.info("Content analysis completed successfully with model: %s", ai_response["model"])
         return jsonify(result)
         
+    except RateLimitError as e:
+        return rate_limited_response(e)
+    
+    except AdmissionRejected as e:
+        return service_overloaded_response(e)
+    
     except Exception as e:
-        logger.error(f"Content analysis error: {e}")
+        logger.error("Content analysis error: %s", e)
         return jsonify({
             "error": "Analysis error",
             "message": "Failed to analyze content"
         }), 500
+
+@upload_bp.route('/precomputed/<content_hash>', methods=['GET'])
+def get_precomputed(content_hash):
+    """Status and, once ready, the precomputed summary and outline of a document."""
+    if not Config.PRECOMPUTE_ENABLED:
+        return jsonify({
+            "error": "Precompute disabled",
+            "message": "Set PRECOMPUTE_ENABLED=true to warm up document summaries"
+        }), 404
+    
+    result = precompute_service.describe(content_hash)
+    return jsonify(result), 200 if result["status"] != "unknown" else 404
@@ -0,0 +1,221 @@
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import Config
+from services.tenants import ANONYMOUS_TENANT, tenant_weight
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when an upstream call is shed because the model is saturated."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _ModelState:
+    def __init__(self, initial_limit: float, expected_latency_ms: float):
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.latency_ms = expected_latency_ms
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+        # Start-time fair queuing state
+        self.virtual_time = 0.0
+        self.last_finish: Dict[str, float] = {}
+        self.waiters: List[Tuple[float, int, str]] = []
+
+    @property
+    def waiting(self) -> int:
+        return len(self.waiters)
+
+
+class AdmissionController:
+    """
+    Per-model concurrency limiter for upstream Groq calls.
+
+    Each model has an adaptive concurrency limit. Calls beyond the limit wait
+    in a bounded queue; when the queue is full or the wait exceeds
+    ``max_queue_wait`` the call is rejected with ``AdmissionRejected`` so the
+    route can answer 503 instead of piling up blocked workers. Waiting calls
+    are ordered fairly between tenants (see ``acquire``). Limits follow
+    AIMD: each fast, successful call grows the limit by ``1 / limit`` (about
+    +1 per round trip of the full window), and a slow or rate-limited call
+    cuts it by ``decrease_factor``. Calls in flight when a slowdown starts
+    all report it, so the limit is cut at most once per smoothed round trip.
+    """
+
+    def __init__(self,
+                 initial_limit: int = Config.ADMISSION_INITIAL_LIMIT,
+                 min_limit: int = Config.ADMISSION_MIN_LIMIT,
+                 max_limit: int = Config.ADMISSION_MAX_LIMIT,
+                 max_queue: int = Config.ADMISSION_MAX_QUEUE,
+                 max_queue_wait: float = Config.ADMISSION_MAX_QUEUE_WAIT,
+                 latency_target_ms: float = Config.ADMISSION_LATENCY_TARGET_MS,
+                 decrease_factor: float = Config.ADMISSION_DECREASE_FACTOR):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.latency_target_ms = latency_target_ms
+        self.decrease_factor = decrease_factor
+        self._models: Dict[str, _ModelState] = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    def _state(self, model_id: str) -> _ModelState:
+        state = self._models.get(model_id)
+        if state is None:
+            with self._lock:
+                state = self._models.get(model_id)
+                if state is None:
+                    state = _ModelState(self.initial_limit, self.latency_target_ms / 4)
+                    self._models[model_id] = state
+        return state
+
+    def _retry_after(self, state: _ModelState) -> float:
+        """Estimate how long until a slot frees up, in whole seconds."""
+        backlog = (state.waiting + 1) / max(state.limit, 1.0)
+        return max(1, math.ceil(state.latency_ms / 1000 * backlog))
+
+    @staticmethod
+    def _start_tag(state: _ModelState, tenant: str, cost: float) -> float:
+        """Assign a start tag and advance the tenant's finish tag."""
+        start = max(state.virtual_time, state.last_finish.get(tenant, 0.0))
+        state.last_finish[tenant] = start + cost / tenant_weight(tenant)
+        if len(state.last_finish) > 1024:
+            # Tenants whose finish tag is behind virtual time carry no history
+            state.last_finish = {
+                name: finish for name, finish in state.last_finish.items() if finish > state.virtual_time
+            }
+        return start
+
+    def acquire(self, model_id: str, tenant: str = ANONYMOUS_TENANT, cost: float = 1.0) -> None:
+        """
+        Take a slot for ``model_id``, waiting if the model is at its limit.
+
+        Waiting calls are dispatched in start-tag order (start-time fair
+        queuing), so each tenant gets capacity in proportion to its weight
+        regardless of how many calls it queues. ``cost`` is the relative size
+        of the call, e.g. estimated tokens in thousands.
+        """
+        state = self._state(model_id)
+        with state.condition:
+            if state.in_flight < int(state.limit) and not state.waiters:
+                state.virtual_time = max(state.virtual_time, self._start_tag(state, tenant, cost))
+                state.in_flight += 1
+                state.admitted += 1
+                return
+
+            if state.waiting >= self.max_queue:
+                state.shed += 1
+                raise AdmissionRejected(
+                    f"Model {model_id} is saturated (queue full)", self._retry_after(state)
+                )
+
+            entry = (self._start_tag(state, tenant, cost), next(self._sequence), tenant)
+            heapq.heappush(state.waiters, entry)
+            deadline = time.monotonic() + self.max_queue_wait
+            try:
+                while state.in_flight >= int(state.limit) or state.waiters[0] is not entry:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        state.shed += 1
+                        raise AdmissionRejected(
+                            f"Model {model_id} is saturated (queue wait exceeded)", self._retry_after(state)
+                        )
+                    state.condition.wait(remaining)
+                heapq.heappop(state.waiters)
+            except AdmissionRejected:
+                state.waiters.remove(entry)
+                heapq.heapify(state.waiters)
+                # The head may have changed; let the new head re-check
+                state.condition.notify_all()
+                raise
+
+            state.virtual_time = max(state.virtual_time, entry[0])
+            state.in_flight += 1
+            state.admitted += 1
+            # Another slot may still be free for the next waiter in line
+            state.condition.notify_all()
+
+    def release(self, model_id: str, latency_ms: Optional[float] = None, overloaded: bool = False) -> None:
+        """Free a slot and adapt the limit to the observed outcome."""
+        state = self._state(model_id)
+        with state.condition:
+            state.in_flight -= 1
+            if overloaded or (latency_ms is not None and latency_ms > self.latency_target_ms):
+                now = time.monotonic()
+                if now - state.last_decrease >= state.latency_ms / 1000:
+                    state.limit = max(float(self.min_limit), state.limit * self.decrease_factor)
+                    state.last_decrease = now
+                    logger.info("Admission limit for %s decreased to %.1f", model_id, state.limit)
+            elif latency_ms is not None:
+                state.limit = min(float(self.max_limit), state.limit + 1 / state.limit)
+            if latency_ms is not None:
+                state.latency_ms = 0.8 * state.latency_ms + 0.2 * latency_ms
+            state.condition.notify_all()
+
+    @contextmanager
+    def slot(self, model_id: str, tenant: str = ANONYMOUS_TENANT, cost: float = 1.0) -> Iterator[Dict]:
+        """
+        Hold a slot for one upstream call. The caller fills ``outcome`` with
+        ``latency_ms`` and ``overloaded`` so the limit can adapt.
+        """
+        self.acquire(model_id, tenant, cost)
+        outcome = {"latency_ms": None, "overloaded": False}
+        try:
+            yield outcome
+        finally:
+            self.release(model_id, outcome["latency_ms"], outcome["overloaded"])
+
+    def has_headroom(self, model_id: str, max_saturation: float) -> bool:
+        """True when nobody is queued for ``model_id`` and it is below ``max_saturation``."""
+        state = self._state(model_id)
+        with state.condition:
+            return not state.waiters and state.in_flight < state.limit * max_saturation
+
+    def snapshot(self) -> Dict:
+        """Saturation per model and overall, for the health endpoint."""
+        with self._lock:
+            states = dict(self._models)
+
+        models = {}
+        total_in_flight = 0
+        total_limit = 0.0
+        for model_id, state in states.items():
+            with state.condition:
+                limit = int(state.limit)
+                waiting_by_tenant = {}
+                for _, _, tenant in state.waiters:
+                    waiting_by_tenant[tenant] = waiting_by_tenant.get(tenant, 0) + 1
+                models[model_id] = {
+                    "limit": limit,
+                    "in_flight": state.in_flight,
+                    "waiting": state.waiting,
+                    "waiting_by_tenant": waiting_by_tenant,
+                    "admitted": state.admitted,
+                    "shed": state.shed,
+                    "saturation": round(state.in_flight / limit, 3) if limit else 1.0
+                }
+                total_in_flight += state.in_flight
+                total_limit += limit
+
+        return {
+            "saturation": round(total_in_flight / total_limit, 3) if total_limit else 0.0,
+            "models": models
+        }
+
+
+# Shared controller for all upstream calls in this process
+admission_controller = AdmissionController()
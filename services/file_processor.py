@@ -1,9 +1,13 @@
+import io
 import os
+import base64
 import logging
+import time
 from typing import Optional, Dict
-import PyPDF2
+from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 from config import Config
+from services.text_pipeline import analyze_text, count_words, decode_stream
 
 logger = logging.getLogger(__name__)
 
@@ -35,12 +39,12 @@ class FileProcessor:
             filename = secure_filename(file.filename)
             file_extension = filename.rsplit('.', 1)[1].lower()
             
-            logger.debug(f"Processing file: {filename} ({file_size} bytes)")
+            logger.debug("Processing file: %s (%s bytes)", filename, file_size)
             
             if file_extension == 'pdf':
-                content = FileProcessor._extract_pdf_text(file)
+                extracted = analyze_text([FileProcessor._extract_pdf_text(file)])
             elif file_extension == 'txt':
-                content = FileProcessor._extract_text_content(file)
+                extracted = FileProcessor._extract_text_content(file)
             else:
                 raise ValueError(f"Unsupported file type: {file_extension}")
             
@@ -48,17 +52,79 @@ class FileProcessor:
                 "filename": filename,
                 "size": file_size,
                 "type": file_extension,
-                "content": content,
-                "word_count": len(content.split()) if content else 0
+                "content": extracted["content"],
+                "word_count": extracted["word_count"],
+                "char_count": extracted["char_count"],
+                "line_count": extracted["line_count"],
+                "encoding": extracted.get("encoding"),
+                "preview": extracted["preview"],
+                # Spans for retrieval over the content, computed in the same pass
+                "chunks": extracted["chunks"]
             }
             
         except Exception as e:
-            logger.error(f"File processing error: {e}")
+            logger.error("File processing error: %s", e)
             raise
     
+    @staticmethod
+    def process_bytes(filename: str, data: bytes) -> Dict:
+        """Process an already-read upload; picklable entry point for worker pools."""
+        return FileProcessor.process_file(FileStorage(stream=io.BytesIO(data), filename=filename))
+
+    @staticmethod
+    def count_words(text: Optional[str]) -> int:
+        """Count whitespace-separated words in text."""
+        return count_words(text)
+
+    @staticmethod
+    def prepare_image(image_file) -> Dict:
+        """
+        Validate an uploaded image and encode it as a data URL.
+
+        Returns the data URL with the original and encoded sizes and the
+        time spent reading and encoding, in milliseconds.
+        """
+        if not image_file or image_file.filename == '':
+            raise ValueError("No image selected")
+
+        if image_file.content_type not in Config.ALLOWED_IMAGE_TYPES:
+            raise ValueError(f"Invalid image type for {image_file.filename}. Supported formats: JPEG, PNG, GIF, WebP")
+
+        started = time.perf_counter()
+        image_data = image_file.read()
+        if len(image_data) > Config.MAX_IMAGE_SIZE:
+            raise ValueError(f"Image too large: {image_file.filename}. Image size cannot exceed {Config.MAX_IMAGE_SIZE // (1024*1024)}MB")
+
+        data_url = FileProcessor.encode_image_data_url(image_data, image_file.content_type)
+        return {
+            "filename": secure_filename(image_file.filename),
+            "content_type": image_file.content_type,
+            "size": len(image_data),
+            "data_url": data_url,
+            "encoded_bytes": len(data_url),
+            "preprocess_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    @staticmethod
+    def encode_image_data_url(image_data: bytes, content_type: str) -> str:
+        """Encode raw image bytes as a base64 data URL."""
+        # Ensure proper image format for Groq
+        if content_type in ['image/jpeg', 'image/jpg']:
+            mime_type = 'image/jpeg'
+        elif content_type in ['image/png', 'image/gif', 'image/webp']:
+            mime_type = content_type
+        else:
+            mime_type = 'image/jpeg'  # Default fallback
+
+        image_base64 = base64.b64encode(image_data).decode('ascii')
+        return f"data:{mime_type};base64,{image_base64}"
+
     @staticmethod
     def _extract_pdf_text(file) -> str:
         """Extract text from PDF file."""
+        # Imported lazily so instances that never parse PDFs skip the cost
+        import PyPDF2
+
         try:
             reader = PyPDF2.PdfReader(file)
             text_content = []
@@ -68,37 +134,38 @@ class FileProcessor:
                     page_text = page.extract_text()
                     if page_text.strip():
                         text_content.append(page_text)
-                    logger.debug(f"Extracted text from page {page_num + 1}")
+                    logger.debug("Extracted text from page %s", page_num + 1)
                 except Exception as e:
-                    logger.warning(f"Failed to extract text from page {page_num + 1}: {e}")
+                    logger.warning("Failed to extract text from page %s: %s", page_num + 1, e)
                     continue
             
             if not text_content:
                 raise ValueError("No readable text found in PDF")
             
             full_text = "\n\n".join(text_content)
-            logger.debug(f"Successfully extracted {len(full_text)} characters from PDF")
+            logger.debug("Successfully extracted %s characters from PDF", len(full_text))
             
             return full_text
             
         except Exception as e:
-            logger.error(f"PDF extraction failed: {e}")
+            logger.error("PDF extraction failed: %s", e)
             raise ValueError(f"Failed to process PDF: {str(e)}")
     
     @staticmethod
-    def _extract_text_content(file) -> str:
-        """Extract text from plain text file."""
+    def _extract_text_content(file) -> Dict:
+        """Decode a plain text file in chunks; returns content, stats and chunk spans."""
         try:
-            content = file.read().decode('utf-8')
-            if not content.strip():
+            extracted = decode_stream(file)
+            if not extracted["word_count"]:
                 raise ValueError("Text file is empty")
             
-            logger.debug(f"Successfully extracted {len(content)} characters from text file")
-            return content
+            logger.debug("Successfully extracted %s characters from text file (%s)",
+                         extracted["char_count"], extracted["encoding"])
+            return extracted
             
         except UnicodeDecodeError:
             logger.error("File encoding error")
-            raise ValueError("File must be UTF-8 encoded text")
+            raise ValueError("File encoding could not be decoded")
         except Exception as e:
-            logger.error(f"Text extraction failed: {e}")
+            logger.error("Text extraction failed: %s", e)
             raise ValueError(f"Failed to process text file: {str(e)}")
@@ -1,10 +1,52 @@
 import requests
 import logging
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 from config import Config
+from services.admission import AdmissionRejected, admission_controller
+from services.model_router import model_router
+from services.tenants import SHARED_TENANTS, current_tenant, usage_tracker
+from services.semantic_cache import context_fingerprint, semantic_cache
+from services.upstream_traffic import traffic_recorder, traffic_replay
+from services.worker_pool import submit_io
+from utils.traffic_log import BAD_RESPONSE, CONNECTION_ERROR, NO_RESPONSE
+from utils.text_similarity import content_terms, jaccard, tokenize
 
 logger = logging.getLogger(__name__)
 
+# Prompt templates for pro mode perspectives, used in order up to the requested count
+PRO_MODE_PERSPECTIVES = (
+    "Analiza esto de manera integral considerando el contexto previo: {message}",
+    "Proporciona información detallada sobre: {message}",
+    "¿Cuáles son los aspectos clave e implicaciones de: {message}?",
+    "¿Qué ventajas, riesgos y alternativas existen en relación con: {message}?",
+    "Explica con ejemplos prácticos y casos concretos: {message}"
+)
+
+# An unknown model would make every perspective call fail and pro mode would
+# quietly fall back to a basic answer, so it is checked once here
+_PERSPECTIVE_MODEL = Config.PRO_MODE_PERSPECTIVE_MODEL
+if _PERSPECTIVE_MODEL and _PERSPECTIVE_MODEL not in Config.AVAILABLE_MODELS:
+    logger.warning("Unknown PRO_MODE_PERSPECTIVE_MODEL %r, using the synthesis model. Available models: %s",
+                   _PERSPECTIVE_MODEL, list(Config.MODEL_KEYS))
+    _PERSPECTIVE_MODEL = ""
+
+
+class RateLimitError(Exception):
+    """Raised when the Groq API answers 429 Too Many Requests."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
 class GroqClient:
     def __init__(self):
         self.api_key = Config.GROQ_API_KEY
@@ -21,6 +63,20 @@ class GroqClient:
 
     def _make_request(self, payload: Dict) -> Dict:
         """Make a request to the Groq API."""
+        if not Config.ADMISSION_ENABLED:
+            return self._send_request(payload, {"latency_ms": None, "overloaded": False})
+
+        # Size the call in thousands of tokens so fair queuing charges big prompts more
+        cost = (model_router.estimate_tokens(payload.get("messages", [])) + payload.get("max_tokens", 0)) / 1000
+        with admission_controller.slot(payload.get("model"), current_tenant.get(), cost) as outcome:
+            return self._send_request(payload, outcome)
+
+    def _send_request(self, payload: Dict, outcome: Dict) -> Dict:
+        """POST the payload, recording latency and overload signals in ``outcome``."""
+        if traffic_replay is not None:
+            return self._replay_request(payload, outcome)
+
+        started = time.perf_counter()
         try:
             response = requests.post(
                 self.api_url,
@@ -28,30 +84,86 @@ class GroqClient:
                 json=payload,
                 timeout=30
             )
+            outcome["latency_ms"] = (time.perf_counter() - started) * 1000
+
+            if response.status_code == 429:
+                outcome["overloaded"] = True
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                self._record(payload, 429, outcome["latency_ms"], retry_after=retry_after)
+                logger.warning("Groq API rate limit hit for model %s", payload.get("model"))
+                raise RateLimitError("Groq API rate limit exceeded", retry_after=retry_after)
+
+            if response.status_code >= 400:
+                self._record(payload, response.status_code, outcome["latency_ms"])
             response.raise_for_status()
-            return response.json()
+            try:
+                data = response.json()
+            except ValueError as e:
+                # requests' JSONDecodeError is also a RequestException; keep it apart from connection failures
+                self._record(payload, BAD_RESPONSE, outcome["latency_ms"])
+                logger.error("Groq API returned an invalid JSON body: %s", e)
+                raise Exception(f"Invalid response from Groq API: {str(e)}")
+            # Only successful calls feed the router's latency estimate
+            model_router.record_latency(payload.get("model"), outcome["latency_ms"])
+            self._record(payload, response.status_code, outcome["latency_ms"], data)
+            usage_tracker.record_usage(current_tenant.get(), data.get("usage"))
+            return data
+        except requests.exceptions.Timeout as e:
+            outcome["overloaded"] = True
+            self._record(payload, NO_RESPONSE, (time.perf_counter() - started) * 1000)
+            logger.error("Groq API request timed out: %s", e)
+            raise Exception(f"Failed to communicate with Groq API: {str(e)}")
+        except requests.exceptions.HTTPError as e:
+            logger.error("Groq API request failed: %s", e)
+            raise Exception(f"Failed to communicate with Groq API: {str(e)}")
         except requests.exceptions.RequestException as e:
-            logger.error(f"Groq API request failed: {e}")
+            self._record(payload, CONNECTION_ERROR, (time.perf_counter() - started) * 1000)
+            logger.error("Groq API request failed: %s", e)
             raise Exception(f"Failed to communicate with Groq API: {str(e)}")
 
-    def chat_completion(self, 
-                       message: str, 
-                       model: str = Config.DEFAULT_MODEL,
-                       context: Optional[str] = None,
-                       system_prompt: Optional[str] = None,
-                       conversation_history: Optional[List[Dict]] = None) -> Dict:
-        """Get a chat completion from Groq."""
-
-        # Validate model
-        if model not in Config.AVAILABLE_MODELS:
-            raise ValueError(f"Invalid model. Available models: {list(Config.AVAILABLE_MODELS.keys())}")
-
-        # Extract model ID properly
-        model_info = Config.AVAILABLE_MODELS[model]
-        if isinstance(model_info, dict):
-            model_id = model_info['id']
-        else:
-            model_id = model_info
+    @staticmethod
+    def _record(payload: Dict, status: int, latency_ms: float,
+                response: Optional[Dict] = None, retry_after: Optional[float] = None) -> None:
+        if traffic_recorder is not None:
+            traffic_recorder.record(payload, status, latency_ms, response, retry_after)
+
+    def _replay_request(self, payload: Dict, outcome: Dict) -> Dict:
+        """Answer from the recorded traffic log with the recorded latency."""
+        entry = traffic_replay.match(payload)
+        started = time.perf_counter()
+        time.sleep(traffic_replay.delay_s(entry))
+        outcome["latency_ms"] = (time.perf_counter() - started) * 1000
+
+        status = entry["status"]
+        if status == 429:
+            outcome["overloaded"] = True
+            raise RateLimitError("Groq API rate limit exceeded", retry_after=entry.get("retry_after"))
+        if status == NO_RESPONSE:
+            outcome["overloaded"] = True
+            raise Exception("Failed to communicate with Groq API: replayed timeout")
+        if status == CONNECTION_ERROR:
+            raise Exception("Failed to communicate with Groq API: replayed connection error")
+        if status == BAD_RESPONSE:
+            raise Exception("Invalid response from Groq API: replayed invalid JSON body")
+        if status >= 400:
+            raise Exception(f"Failed to communicate with Groq API: replayed HTTP {status}")
+
+        model_router.record_latency(payload.get("model"), outcome["latency_ms"])
+        data = traffic_replay.response_body(entry, payload)
+        usage_tracker.record_usage(current_tenant.get(), data.get("usage"))
+        return data
+
+    @staticmethod
+    def build_chat_payload(message: str,
+                           model: str = Config.DEFAULT_MODEL,
+                           context: Optional[str] = None,
+                           system_prompt: Optional[str] = None,
+                           conversation_history: Optional[List[Dict]] = None) -> Dict:
+        """Build the chat-completions request payload."""
+        # Validate model and resolve its API ID
+        model_id = Config.MODEL_IDS.get(model)
+        if model_id is None:
+            raise ValueError(f"Invalid model. Available models: {list(Config.MODEL_KEYS)}")
 
         # Build messages
         messages = []
@@ -69,7 +181,7 @@ class GroqClient:
         # Always add the current message
         messages.append({"role": "user", "content": message})
 
-        payload = {
+        return {
             "model": model_id,
             "messages": messages,
             "temperature": 0.7,
@@ -77,24 +189,228 @@ class GroqClient:
             "stream": False
         }
 
-        logger.debug(f"Sending request to Groq with model: {model_id}")
+    def chat_completion(self, 
+                       message: str, 
+                       model: str = Config.DEFAULT_MODEL,
+                       context: Optional[str] = None,
+                       system_prompt: Optional[str] = None,
+                       conversation_history: Optional[List[Dict]] = None,
+                       routing_tier: Optional[str] = None,
+                       latency_slo_ms: Optional[float] = None,
+                       use_cache: bool = True) -> Dict:
+        """
+        Get a chat completion from Groq.
+
+        ``use_cache`` enables the semantic cache (when configured) for this
+        call; internal prompts built by pro mode or background jobs pass
+        False so only user-facing questions are cached. Anonymous and
+        overflow callers are never served from or stored in the cache.
+        """
+
+        if model == Config.AUTO_MODEL:
+            return self._routed_completion(
+                message,
+                context=context,
+                system_prompt=system_prompt,
+                conversation_history=conversation_history,
+                routing_tier=routing_tier,
+                latency_slo_ms=latency_slo_ms,
+                use_cache=use_cache
+            )
+
+        payload = self.build_chat_payload(
+            message,
+            model=model,
+            context=context,
+            system_prompt=system_prompt,
+            conversation_history=conversation_history
+        )
+        model_id = payload["model"]
+
+        tenant = current_tenant.get()
+        # Callers without their own tenant would see each other's answers
+        use_cache = use_cache and Config.SEMANTIC_CACHE_ENABLED and tenant not in SHARED_TENANTS
+        if use_cache:
+            context_hash = context_fingerprint(context, system_prompt, conversation_history)
+            cached = semantic_cache.lookup(model, context_hash, message, tenant)
+            if cached is not None:
+                cached_response, similarity = cached
+                logger.debug("Semantic cache hit for model %s (similarity %.3f)", model, similarity)
+                result = dict(cached_response)
+                result["usage"] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                result["cache"] = {"hit": True, "similarity": round(similarity, 3)}
+                return result
+
+        logger.debug("Sending request to Groq with model: %s", model_id)
         response = self._make_request(payload)
 
-        return {
+        result = {
             "content": response["choices"][0]["message"]["content"],
             "model": model,
             "usage": response.get("usage", {}),
             "finish_reason": response["choices"][0].get("finish_reason")
         }
 
+        if use_cache:
+            semantic_cache.store(model, context_hash, message, dict(result), tenant)
+        return result
+
+    def select_models(self,
+                      message: str,
+                      context: Optional[str] = None,
+                      system_prompt: Optional[str] = None,
+                      conversation_history: Optional[List[Dict]] = None,
+                      routing_tier: Optional[str] = None,
+                      latency_slo_ms: Optional[float] = None) -> Tuple[List[str], Dict]:
+        """Rank models for an "auto" request and describe the routing decision."""
+        tier = routing_tier or Config.DEFAULT_ROUTING_TIER
+        messages = self.build_chat_payload(
+            message,
+            context=context,
+            system_prompt=system_prompt,
+            conversation_history=conversation_history
+        )["messages"]
+        prompt_tokens = model_router.estimate_tokens(messages)
+        candidates = model_router.rank(prompt_tokens, tier=tier, latency_slo_ms=latency_slo_ms)
+
+        routing = {
+            "requested": Config.AUTO_MODEL,
+            "selected": candidates[0],
+            "tier": tier,
+            "latency_slo_ms": latency_slo_ms,
+            "estimated_prompt_tokens": prompt_tokens,
+            "candidates": candidates,
+            "attempts": []
+        }
+        return candidates, routing
+
+    def _routed_completion(self,
+                           message: str,
+                           context: Optional[str] = None,
+                           system_prompt: Optional[str] = None,
+                           conversation_history: Optional[List[Dict]] = None,
+                           routing_tier: Optional[str] = None,
+                           latency_slo_ms: Optional[float] = None,
+                           use_cache: bool = True) -> Dict:
+        """Try ranked models in order, moving on when one is rate-limited."""
+        candidates, routing = self.select_models(
+            message,
+            context=context,
+            system_prompt=system_prompt,
+            conversation_history=conversation_history,
+            routing_tier=routing_tier,
+            latency_slo_ms=latency_slo_ms
+        )
+
+        last_error = None
+        for candidate in candidates:
+            try:
+                response = self.chat_completion(
+                    message,
+                    model=candidate,
+                    context=context,
+                    system_prompt=system_prompt,
+                    conversation_history=conversation_history,
+                    use_cache=use_cache
+                )
+            except RateLimitError as e:
+                logger.info("Routed model %s is rate limited, trying next candidate", candidate)
+                model_router.mark_rate_limited(candidate, e.retry_after)
+                routing["attempts"].append({"model": candidate, "outcome": "rate_limited"})
+                last_error = e
+                continue
+            except AdmissionRejected as e:
+                logger.info("Routed model %s is saturated, trying next candidate", candidate)
+                routing["attempts"].append({"model": candidate, "outcome": "shed"})
+                last_error = e
+                continue
+
+            routing["attempts"].append({"model": candidate, "outcome": "ok"})
+            routing["selected"] = candidate
+            response["routing"] = routing
+            return response
+
+        if isinstance(last_error, AdmissionRejected):
+            raise AdmissionRejected("All candidate models are saturated", last_error.retry_after)
+        raise RateLimitError(
+            "All candidate models are rate limited",
+            retry_after=last_error.retry_after if last_error else None
+        )
+
+    @staticmethod
+    def _sum_usage(usages: List[Dict]) -> Dict:
+        """Add up token usage across several completions."""
+        total = {}
+        for usage in usages:
+            for key, value in usage.items():
+                if isinstance(value, (int, float)):
+                    total[key] = total.get(key, 0) + value
+        return total
+
+    @staticmethod
+    def _agreement(responses: List[str]) -> Tuple[float, int]:
+        """
+        Minimum pairwise similarity between responses, plus the index of the
+        response most similar to the others on average. Similarity is the
+        Jaccard index of the responses' content terms, since separately
+        generated answers rarely repeat exact word pairs even when they say
+        the same thing. An empty response agrees with nothing, not even
+        another empty one.
+        """
+        shingle_sets = [content_terms(tokenize(response)) for response in responses]
+        scores = [0.0] * len(responses)
+        minimum = 1.0
+        for i in range(len(responses)):
+            for j in range(i + 1, len(responses)):
+                if shingle_sets[i] and shingle_sets[j]:
+                    similarity = jaccard(shingle_sets[i], shingle_sets[j])
+                else:
+                    similarity = 0.0
+                minimum = min(minimum, similarity)
+                scores[i] += similarity
+                scores[j] += similarity
+        best = max(range(len(responses)), key=lambda i: (scores[i], len(responses[i])))
+        return minimum, best
+
     def pro_mode_completion(self, 
                            message: str, 
                            model: str = Config.DEFAULT_MODEL,
                            context: Optional[str] = None,
-                           conversation_history: Optional[List[Dict]] = None) -> Dict:
-        """Generate enhanced response using multiple queries and synthesis."""
+                           conversation_history: Optional[List[Dict]] = None,
+                           routing_tier: Optional[str] = None,
+                           latency_slo_ms: Optional[float] = None,
+                           perspectives: Optional[int] = None,
+                           perspective_model: Optional[str] = None) -> Dict:
+        """
+        Generate enhanced response using multiple queries and synthesis.
+
+        ``perspectives`` overrides ``Config.PRO_MODE_QUERIES`` and
+        ``perspective_model`` lets the perspective calls use a cheaper model
+        than the synthesis call. Once the collected perspectives agree above
+        ``Config.PRO_MODE_AGREEMENT_THRESHOLD``, remaining perspectives and the
+        synthesis call are skipped.
+        """
+
+        routing = None
+        if model == Config.AUTO_MODEL:
+            # Pro mode issues several calls; route once so they share a model
+            candidates, routing = self.select_models(
+                message,
+                context=context,
+                conversation_history=conversation_history,
+                routing_tier=routing_tier,
+                latency_slo_ms=latency_slo_ms
+            )
+            model = candidates[0]
+
+        query_count = perspectives or Config.PRO_MODE_QUERIES
+        query_count = max(1, min(query_count, len(PRO_MODE_PERSPECTIVES)))
+        perspective_model = perspective_model or _PERSPECTIVE_MODEL or model
 
         try:
+            started = time.perf_counter()
+            timings = {"perspectives_ms": [], "synthesis_ms": None}
+
             # Construir contexto conversacional si existe historial
             conversation_context = ""
             if conversation_history and len(conversation_history) > 0:
@@ -104,35 +420,50 @@ class GroqClient:
                     conversation_context += f"{role_text}: {msg['content'][:200]}...\n"
                 conversation_context += "\nTen en cuenta este contexto para responder de manera coherente.\n"
 
-            # Step 1: Generate multiple perspective queries with context
-            perspectives = [
-                f"{conversation_context}Analiza esto de manera integral considerando el contexto previo: {message}",
-                f"{conversation_context}Proporciona información detallada sobre: {message}",
-                f"{conversation_context}¿Cuáles son los aspectos clave e implicaciones de: {message}?"
-            ]
-
             responses = []
+            usages = []
+            agreement = None
+            representative = 0
 
-            # Step 2: Get responses for each perspective
-            for i, perspective in enumerate(perspectives):
+            # Step 1: Get responses for each perspective, stopping early on agreement
+            for i, template in enumerate(PRO_MODE_PERSPECTIVES[:query_count]):
+                stage_started = time.perf_counter()
                 try:
                     response = self.chat_completion(
-                        perspective, 
-                        model=model, 
+                        conversation_context + template.format(message=message),
+                        model=perspective_model, 
                         context=context,
-                        system_prompt="Proporciona una respuesta detallada y analítica con ejemplos específicos e información útil. Responde siempre en español."
+                        system_prompt="Proporciona una respuesta detallada y analítica con ejemplos específicos e información útil. Responde siempre en español.",
+                        use_cache=False
                     )
                     responses.append(response["content"])
-                    logger.debug(f"Pro mode query {i+1} completed")
+                    usages.append(response.get("usage", {}))
+                    logger.debug("Pro mode query %s completed", i + 1)
+                except AdmissionRejected:
+                    raise
                 except Exception as e:
-                    logger.warning(f"Pro mode query {i+1} failed: {e}")
+                    logger.warning("Pro mode query %s failed: %s", i + 1, e)
                     continue
+                finally:
+                    timings["perspectives_ms"].append(round((time.perf_counter() - stage_started) * 1000, 1))
+
+                if len(responses) >= 2:
+                    agreement, representative = self._agreement(responses)
+                    if agreement >= Config.PRO_MODE_AGREEMENT_THRESHOLD:
+                        logger.debug("Pro mode perspectives agree (%.2f), stopping after %s", agreement, len(responses))
+                        break
 
             if not responses:
                 raise Exception("All pro mode queries failed")
 
-            # Step 3: Synthesize all responses
-            synthesis_prompt = f"""
+            skip_synthesis = len(responses) == 1 and query_count == 1
+            skip_synthesis = skip_synthesis or (agreement is not None and agreement >= Config.PRO_MODE_AGREEMENT_THRESHOLD)
+
+            if skip_synthesis:
+                content = responses[representative]
+            else:
+                # Step 2: Synthesize all responses
+                synthesis_prompt = f"""
             Basándote en las siguientes múltiples respuestas analíticas a la pregunta "{message}", 
             crea una respuesta final integral y bien estructurada que sintetice las mejores ideas:
 
@@ -141,56 +472,93 @@ class GroqClient:
             Proporciona una respuesta detallada y autoritativa que combine los mejores elementos de todas las perspectivas.
             """
 
-            final_response = self.chat_completion(
-                synthesis_prompt,
-                model=model,
-                context=context,
-                system_prompt="Eres un experto sintetizador. Crea respuestas integrales y bien estructuradas. Responde siempre en español de manera clara y útil."
-            )
+                stage_started = time.perf_counter()
+                final_response = self.chat_completion(
+                    synthesis_prompt,
+                    model=model,
+                    context=context,
+                    system_prompt="Eres un experto sintetizador. Crea respuestas integrales y bien estructuradas. Responde siempre en español de manera clara y útil.",
+                    use_cache=False
+                )
+                timings["synthesis_ms"] = round((time.perf_counter() - stage_started) * 1000, 1)
+                content = final_response["content"]
+                usages.append(final_response.get("usage", {}))
 
-            return {
-                "content": final_response["content"],
+            timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+            result = {
+                "content": content,
                 "model": model,
                 "mode": "pro",
+                "perspectives_requested": query_count,
                 "perspectives_analyzed": len(responses),
-                "usage": final_response.get("usage", {})
+                "perspective_model": perspective_model,
+                "synthesis_skipped": skip_synthesis,
+                "agreement": round(agreement, 3) if agreement is not None else None,
+                "timings": timings,
+                "usage": self._sum_usage(usages)
             }
+            if routing:
+                result["routing"] = routing
+            return result
 
+        except AdmissionRejected:
+            # Falling back would only add more load to a saturated model
+            raise
         except Exception as e:
-            logger.error(f"Pro mode completion failed: {e}")
+            logger.error("Pro mode completion failed: %s", e)
             # Fallback to basic mode
             logger.info("Falling back to basic mode")
             basic_response = self.chat_completion(
                 message, 
-                model=model, 
+                model=Config.AUTO_MODEL if routing else model,
                 context=context, 
-                conversation_history=conversation_history
+                conversation_history=conversation_history,
+                routing_tier=routing_tier,
+                latency_slo_ms=latency_slo_ms
             )
             basic_response["mode"] = "basic (fallback)"
             return basic_response
 
-    def vision_completion(self, message: str, image_url: str, model: str = "meta-llama/llama-4-scout-17b-16e-instruct") -> Dict:
+    @staticmethod
+    def _vision_image_part(image_url: str) -> Dict:
+        # Data URLs keep their own media type (data:image/png;base64,...);
+        # bare base64 content is assumed to be JPEG
+        if not image_url.startswith('data:'):
+            image_url = f"data:image/jpeg;base64,{image_url}"
+
+        return {
+            "type": "image_url",
+            "image_url": {
+                "url": image_url
+            }
+        }
+
+    def vision_completion(self,
+                          message: str,
+                          image_url: Optional[str] = None,
+                          model: str = "meta-llama/llama-4-scout-17b-16e-instruct",
+                          image_urls: Optional[List[str]] = None) -> Dict:
         """
         Generate completion for image analysis using vision models.
 
         Args:
-            message: The user's question or prompt about the image
+            message: The user's question or prompt about the image(s)
             image_url: Base64 data URL of the image
             model: Vision model to use
+            image_urls: Several data URLs sent together in one message
 
         Returns:
             Dict containing the response and metadata
         """
         try:
-            logger.debug(f"Sending vision request to Groq with model: {model}")
+            logger.debug("Sending vision request to Groq with model: %s", model)
 
-            # Extract base64 content from data URL
-            if image_url.startswith('data:'):
-                # Format: data:image/jpeg;base64,/9j/4AAQSkZJRgABA...
-                header, base64_data = image_url.split(',', 1)
-                image_content = base64_data
-            else:
-                image_content = image_url
+            images = list(image_urls or [])
+            if image_url:
+                images.insert(0, image_url)
+            if not images:
+                raise ValueError("At least one image is required")
 
             # Prepare messages for vision model with correct Groq format
             messages = [
@@ -200,14 +568,8 @@ class GroqClient:
                         {
                             "type": "text",
                             "text": message
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_content}"
-                            }
                         }
-                    ]
+                    ] + [self._vision_image_part(url) for url in images]
                 }
             ]
 
@@ -219,28 +581,57 @@ class GroqClient:
                 "stream": False
             }
 
-            logger.debug(f"Making vision API request to Groq")
+            logger.debug("Making vision API request to Groq")
             response = self._make_request(payload)
 
             result = {
                 "content": response["choices"][0]["message"]["content"],
                 "model": model,
                 "mode": "vision",
+                "images": len(images),
                 "finish_reason": response["choices"][0].get("finish_reason"),
                 "usage": response.get("usage", {})
             }
 
-            logger.debug(f"Vision completion successful. Tokens used: {result['usage'].get('total_tokens', 0)}")
+            logger.debug("Vision completion successful. Tokens used: %s", result['usage'].get('total_tokens', 0))
             return result
 
+        except (AdmissionRejected, RateLimitError, ValueError):
+            raise
         except Exception as e:
-            logger.error(f"Vision completion failed: {e}")
+            logger.error("Vision completion failed: %s", e)
             # Provide more detailed error information
             if hasattr(e, 'response') and e.response:
                 try:
                     error_data = e.response.json()
-                    logger.error(f"Groq API error details: {error_data}")
+                    logger.error("Groq API error details: %s", error_data)
                     raise Exception(f"Groq API error: {error_data.get('error', {}).get('message', str(e))}")
                 except:
                     pass
-            raise Exception(f"Error procesando imagen: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error procesando imagen: {str(e)}")
+
+    def vision_batch(self, prompts: List[Dict], model: str = "meta-llama/llama-4-scout-17b-16e-instruct") -> List[Dict]:
+        """
+        Run independent vision prompts concurrently on the shared I/O pool.
+
+        Each prompt is a dict with ``message`` and ``image_urls``. Results are
+        returned in prompt order; a failing prompt yields ``success: False``
+        with its error and ``error_type`` (``rate_limited``, ``overloaded`` or
+        ``upstream``) instead of failing the whole batch.
+        """
+        def run(prompt: Dict) -> Dict:
+            started = time.perf_counter()
+            try:
+                result = self.vision_completion(prompt["message"], model=model, image_urls=prompt["image_urls"])
+                result["success"] = True
+            except RateLimitError as e:
+                result = {"success": False, "error": str(e), "error_type": "rate_limited", "retry_after": e.retry_after}
+            except AdmissionRejected as e:
+                result = {"success": False, "error": str(e), "error_type": "overloaded", "retry_after": e.retry_after}
+            except Exception as e:
+                result = {"success": False, "error": str(e), "error_type": "upstream"}
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return result
+
+        futures = [submit_io(run, prompt) for prompt in prompts]
+        return [future.result() for future in futures]
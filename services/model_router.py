@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English/Spanish text with Llama-style tokenizers
+CHARS_PER_TOKEN = 4
+
+
+class ModelRouter:
+    """
+    Pick a model for ``"model": "auto"`` requests.
+
+    Candidates must fit the estimated prompt plus the completion budget in
+    their context window. Among those, models meeting the tier's minimum
+    quality are ordered by observed latency; the rest follow by descending
+    quality. Models slower than the caller's latency SLO and models recently
+    rate-limited are moved to the back of the list so they are only used as
+    fallbacks.
+    """
+
+    def __init__(self, models: Optional[Dict] = None):
+        self.models = models if models is not None else Config.AVAILABLE_MODELS
+        self._id_to_key = {info['id']: key for key, info in self.models.items()}
+        self._latency_ms = {key: float(info.get('expected_latency_ms', 1000)) for key, info in self.models.items()}
+        self._rate_limited_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_tokens(messages: List[Dict]) -> int:
+        """Estimate prompt tokens from message text length."""
+        chars = 0
+        for message in messages:
+            content = message.get("content", "")
+            if isinstance(content, str):
+                chars += len(content)
+            else:
+                chars += sum(len(part.get("text", "")) for part in content)
+        # Per-message overhead for role markers
+        return chars // CHARS_PER_TOKEN + 4 * len(messages)
+
+    def record_latency(self, model_id: str, latency_ms: float) -> None:
+        """Fold an observed upstream latency into the model's moving average."""
+        key = self._id_to_key.get(model_id)
+        if key is None:
+            return
+        alpha = Config.ROUTING_LATENCY_SMOOTHING
+        with self._lock:
+            self._latency_ms[key] = (1 - alpha) * self._latency_ms[key] + alpha * latency_ms
+
+    def mark_rate_limited(self, model_key: str, retry_after: Optional[float] = None) -> None:
+        cooldown = retry_after if retry_after else Config.ROUTING_RATE_LIMIT_COOLDOWN
+        with self._lock:
+            self._rate_limited_until[model_key] = time.monotonic() + cooldown
+
+    def latency_snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {key: round(value, 1) for key, value in self._latency_ms.items()}
+
+    def rank(self,
+             prompt_tokens: int,
+             tier: str = Config.DEFAULT_ROUTING_TIER,
+             latency_slo_ms: Optional[float] = None,
+             max_output_tokens: int = 2000) -> List[str]:
+        """Return model keys in the order they should be tried."""
+        min_quality = Config.ROUTING_TIERS.get(tier, Config.ROUTING_TIERS[Config.DEFAULT_ROUTING_TIER])
+        needed = prompt_tokens + max_output_tokens
+        now = time.monotonic()
+
+        with self._lock:
+            latencies = dict(self._latency_ms)
+            limited = {key for key, until in self._rate_limited_until.items() if until > now}
+
+        fitting = [key for key, info in self.models.items() if info['context_window'] >= needed]
+        if not fitting:
+            # Nothing fits: try the largest windows and let the API truncate or reject
+            largest = max(info['context_window'] for info in self.models.values())
+            fitting = [key for key, info in self.models.items() if info['context_window'] == largest]
+
+        def sort_key(key):
+            info = self.models[key]
+            meets_quality = info.get('quality', 1) >= min_quality
+            too_slow = latency_slo_ms is not None and latency_slo_ms > 0 and latencies[key] > latency_slo_ms
+            return (
+                key in limited,
+                too_slow,
+                not meets_quality,
+                latencies[key] if meets_quality else -info.get('quality', 1),
+            )
+
+        return sorted(fitting, key=sort_key)
+
+
+# Shared router so latency observations accumulate across requests
+model_router = ModelRouter()
@@ -0,0 +1,243 @@
+import atexit
+import contextvars
+import hashlib
+import logging
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from config import Config
+from services.admission import admission_controller
+from services.groq_client import GroqClient
+
+logger = logging.getLogger(__name__)
+
+# Same prompt the upload route uses for a general analysis, so a precomputed
+# summary is interchangeable with one computed on the request path
+SUMMARY_PROMPT = "Please provide a comprehensive summary and analysis of this document."
+
+_NUMBERED_RE = re.compile(r"^(\d+(?:\.\d+)*)[.)]?\s+\S")
+_MARKDOWN_RE = re.compile(r"^(#{1,6})\s+(\S.*)$")
+
+
+def content_hash(content: str) -> str:
+    """Stable key for extracted document text."""
+    return hashlib.sha256(content.strip().encode("utf-8")).hexdigest()
+
+
+def extract_outline(text: str, max_items: int = 50) -> List[Dict]:
+    """
+    Find section headings with simple layout heuristics.
+
+    Markdown headings, numbered headings ("2.1 Results") and short
+    upper-case lines count; so do short capitalized lines that follow a
+    blank line and do not end like a sentence.
+    """
+    outline = []
+    offset = 0
+    previous_blank = True
+    for raw_line in text.splitlines(keepends=True):
+        line = raw_line.strip()
+        position = offset
+        offset += len(raw_line)
+        if not line:
+            previous_blank = True
+            continue
+
+        level = None
+        title = line
+        markdown = _MARKDOWN_RE.match(line)
+        numbered = _NUMBERED_RE.match(line)
+        if markdown:
+            level, title = len(markdown.group(1)), markdown.group(2)
+        elif len(line) <= 80 and not line.endswith((".", ",", ";")):
+            if numbered:
+                level = numbered.group(1).count(".") + 1
+            elif line.isupper() and any(ch.isalpha() for ch in line):
+                level = 1
+            elif previous_blank and line[0].isupper() and len(line.split()) <= 8:
+                level = 2
+        previous_blank = False
+
+        if level is not None:
+            outline.append({"title": title, "level": level, "offset": position})
+            if len(outline) >= max_items:
+                break
+    return outline
+
+
+class PrecomputeService:
+    """
+    Warm-up of document summaries and outlines after upload.
+
+    Jobs go into a bounded queue served by a few daemon threads. A worker
+    only starts a job while the summary model has spare admission capacity,
+    so precompute yields to interactive traffic; when the queue is full new
+    jobs are dropped. Results are kept in a bounded LRU keyed by content hash.
+    """
+
+    def __init__(self,
+                 model: str = Config.PRECOMPUTE_MODEL,
+                 workers: int = Config.PRECOMPUTE_WORKERS,
+                 queue_size: int = Config.PRECOMPUTE_QUEUE_SIZE,
+                 max_entries: int = Config.PRECOMPUTE_MAX_ENTRIES,
+                 max_saturation: float = Config.PRECOMPUTE_MAX_SATURATION):
+        self.model = model
+        self.workers = workers
+        self.max_entries = max_entries
+        self.max_saturation = max_saturation
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._results: "OrderedDict[str, Dict]" = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.hits = 0
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"precompute-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, content: str) -> Dict:
+        """Queue a summary for ``content`` unless it is cached or already queued."""
+        key = content_hash(content)
+        with self._lock:
+            if key in self._results:
+                return {"content_hash": key, "status": "ready"}
+            if key in self._pending:
+                return {"content_hash": key, "status": "queued"}
+            self._pending.add(key)
+
+        self._ensure_started()
+        # Run under the uploader's context so usage is attributed to their tenant
+        job = (key, content, contextvars.copy_context())
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(key)
+                self.dropped += 1
+            logger.info("Precompute queue full, dropping document %s", key[:12])
+            return {"content_hash": key, "status": "dropped"}
+        return {"content_hash": key, "status": "queued"}
+
+    def lookup(self, content: str, model: str) -> Optional[Dict]:
+        """
+        Precomputed result for ``content`` usable for a request on ``model``.
+
+        The summary is only served when it was produced by the requested
+        model, or when the caller let the router pick one.
+        """
+        key = content_hash(content)
+        with self._lock:
+            result = self._results.get(key)
+            if result is None or model not in (result["model"], Config.AUTO_MODEL):
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def describe(self, key: str) -> Dict:
+        """Status of a document and its result when ready."""
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                return {"content_hash": key, "status": "ready", "result": result}
+            status = "queued" if key in self._pending else "unknown"
+        return {"content_hash": key, "status": status}
+
+    def store(self, content: str, summary: Dict) -> None:
+        """Cache a summary computed elsewhere (e.g. on the request path)."""
+        self._store(content_hash(content), {
+            "summary": summary["content"],
+            "outline": extract_outline(content),
+            "model": summary["model"],
+            "usage": summary.get("usage", {}),
+            "elapsed_ms": None,
+            "created_at": time.time()
+        })
+
+    def _store(self, key: str, result: Dict) -> None:
+        with self._lock:
+            self._pending.discard(key)
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def _wait_for_headroom(self) -> bool:
+        if not Config.ADMISSION_ENABLED:
+            return True
+        model_id = Config.MODEL_IDS.get(self.model, self.model)
+        while not admission_controller.has_headroom(model_id, self.max_saturation):
+            if self._stop.wait(0.5):
+                return False
+        return True
+
+    def _compute(self, key: str, content: str) -> None:
+        started = time.perf_counter()
+        response = GroqClient().chat_completion(message=SUMMARY_PROMPT, model=self.model, context=content,
+                                                use_cache=False)
+        self._store(key, {
+            "summary": response["content"],
+            "outline": extract_outline(content),
+            "model": response["model"],
+            "usage": response.get("usage", {}),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            "created_at": time.time()
+        })
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                key, content, context = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                if not self._wait_for_headroom():
+                    return
+                context.run(self._compute, key, content)
+                with self._lock:
+                    self.completed += 1
+                logger.debug("Precomputed summary for document %s", key[:12])
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                logger.warning("Precompute failed for document %s: %s", key[:12], e)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+                self._queue.task_done()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._results),
+                "max_entries": self.max_entries,
+                "queued": self._queue.qsize(),
+                "pending": len(self._pending),
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "hits": self.hits
+            }
+
+
+# Shared service; only used when Config.PRECOMPUTE_ENABLED
+precompute_service = PrecomputeService()
+atexit.register(precompute_service.stop)
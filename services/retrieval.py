@@ -0,0 +1,90 @@
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+from config import Config
+from services.text_pipeline import ChunkBoundaries
+from utils.text_similarity import tokenize
+
+
+def chunk_boundaries(text: str, chunk_chars: int = Config.RETRIEVAL_CHUNK_CHARS) -> List[Tuple[int, int]]:
+    """Split text into ``(start, end)`` spans of roughly ``chunk_chars``."""
+    chunks = ChunkBoundaries(chunk_chars)
+    chunks.feed(text)
+    return chunks.close()
+
+
+def _score_chunks(chunks: Sequence[str], question: str) -> List[float]:
+    """BM25 score of each chunk against the question."""
+    query_terms = set(tokenize(question))
+    if not query_terms:
+        return [0.0] * len(chunks)
+
+    term_counts = [Counter(tokenize(chunk)) for chunk in chunks]
+    lengths = [sum(counts.values()) for counts in term_counts]
+    average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+    document_frequency = {term: sum(1 for counts in term_counts if term in counts) for term in query_terms}
+
+    k1, b = 1.5, 0.75
+    total = len(chunks)
+    scores = []
+    for counts, length in zip(term_counts, lengths):
+        score = 0.0
+        for term in query_terms:
+            frequency = counts.get(term, 0)
+            if not frequency:
+                continue
+            idf = math.log(1 + (total - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            norm = frequency + k1 * (1 - b + b * length / (average_length or 1))
+            score += idf * frequency * (k1 + 1) / norm
+        scores.append(score)
+    return scores
+
+
+def build_context(documents: Sequence[Dict],
+                  question: str,
+                  budget_chars: int = Config.RETRIEVAL_CONTEXT_CHARS) -> Tuple[str, List[Dict]]:
+    """
+    Select the chunks most relevant to ``question`` across documents.
+
+    ``documents`` are dicts with ``filename`` and ``content`` and, optionally,
+    precomputed ``chunks`` spans. Returns the assembled context (chunks in
+    their original document order) and a list describing which chunks were
+    used.
+    """
+    chunks = []
+    for doc_index, document in enumerate(documents):
+        content = document["content"]
+        spans = document.get("chunks") or chunk_boundaries(content)
+        for chunk_index, (start, end) in enumerate(spans):
+            chunks.append((doc_index, chunk_index, content[start:end]))
+
+    scores = _score_chunks([text for _, _, text in chunks], question)
+    ranked = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+
+    selected = []
+    used = 0
+    for i in ranked:
+        size = len(chunks[i][2])
+        if used + size > budget_chars:
+            continue
+        selected.append(i)
+        used += size
+
+    selected.sort()
+    parts = []
+    sources = []
+    for i in selected:
+        doc_index, chunk_index, text = chunks[i]
+        filename = documents[doc_index]["filename"]
+        parts.append(f"[{filename} - fragmento {chunk_index + 1}]\n{text.strip()}")
+        sources.append({"filename": filename, "chunk": chunk_index, "score": round(scores[i], 3)})
+    return "\n\n".join(parts), sources
+
+
+def context_budget(model: Optional[str], reserved_tokens: int = 2500) -> int:
+    """Character budget for retrieved context that fits the model's window."""
+    info = Config.AVAILABLE_MODELS.get(model) if model else None
+    if not info:
+        return Config.RETRIEVAL_CONTEXT_CHARS
+    window_chars = (info["context_window"] - reserved_tokens) * 4
+    return max(2000, min(Config.RETRIEVAL_CONTEXT_CHARS, window_chars))
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from config import Config
+from services.tenants import ANONYMOUS_TENANT
+from utils.text_similarity import jaccard
+
+logger = logging.getLogger(__name__)
+
+_CONTRACTIONS = (
+    (re.compile(r"\b(what|who|where|how|when|why|that|there|it|he|she)'?s\b"), r"\1 is"),
+    (re.compile(r"n't\b"), " not"),
+    (re.compile(r"'re\b"), " are"),
+    (re.compile(r"'ll\b"), " will"),
+    (re.compile(r"'ve\b"), " have"),
+    (re.compile(r"'d\b"), " would"),
+    (re.compile(r"\bi'?m\b"), "i am"),
+)
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+_SPACE_RE = re.compile(r"\s+")
+
+# MinHash parameters: NUM_PERM = BANDS * ROWS
+_NUM_PERM = 32
+_BANDS = 8
+_ROWS = 4
+# Universal hash family h(x) = (a * x + b) mod p over a stable 64-bit shingle
+# hash, so permutations are independent and signatures match across processes
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240801)
+_PERMUTATIONS = tuple(
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(_NUM_PERM)
+)
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, strip accents, expand common contractions and drop punctuation."""
+    text = unicodedata.normalize("NFKD", text.lower().replace("’", "'"))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    for pattern, replacement in _CONTRACTIONS:
+        text = pattern.sub(replacement, text)
+    text = _NON_WORD_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def char_shingles(text: str, size: int = 3) -> FrozenSet[str]:
+    """Character n-grams of the normalized text, padded so short texts still shingle."""
+    padded = f" {text} "
+    if len(padded) <= size:
+        return frozenset([padded])
+    return frozenset(padded[i:i + size] for i in range(len(padded) - size + 1))
+
+
+def _stable_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash_signature(shingle_set: FrozenSet[str]) -> Tuple[int, ...]:
+    base_hashes = [_stable_hash(shingle) for shingle in shingle_set]
+    return tuple(min([(a * h + b) % _MERSENNE_PRIME for h in base_hashes]) for a, b in _PERMUTATIONS)
+
+
+def context_fingerprint(context: Optional[str],
+                        system_prompt: Optional[str],
+                        conversation_history: Optional[List[Dict]]) -> str:
+    """Hash everything besides the question that shapes the answer."""
+    digest = hashlib.sha1()
+    digest.update((system_prompt or "").encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update((context or "").encode("utf-8"))
+    digest.update(b"\x00")
+    if conversation_history:
+        digest.update(json.dumps(conversation_history, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SemanticCache:
+    """
+    Bounded near-duplicate cache for chat completions.
+
+    Questions are normalized and indexed by MinHash over character shingles
+    with LSH banding, so a lookup only compares against entries sharing at
+    least one band. A hit requires the same tenant, model and context
+    fingerprint, an entry younger than ``ttl`` seconds and a shingle Jaccard
+    similarity of at least ``threshold``.
+    """
+
+    def __init__(self, max_entries: int = 2048, threshold: float = 0.85, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._buckets: Dict[Tuple, set] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _band_keys(scope: Tuple[str, str, str], signature: Tuple[int, ...]) -> List[Tuple]:
+        return [scope + (band, signature[band * _ROWS:(band + 1) * _ROWS]) for band in range(_BANDS)]
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for key in entry["band_keys"]:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def lookup(self, model: str, context_hash: str, question: str,
+               tenant: str = ANONYMOUS_TENANT) -> Optional[Tuple[Dict, float]]:
+        """Return ``(response, similarity)`` for the closest cached question, if any."""
+        normalized = normalize_question(question)
+        shingle_set = char_shingles(normalized)
+        signature = minhash_signature(shingle_set)
+        scope = (tenant, model, context_hash)
+        expired_before = time.monotonic() - self.ttl
+
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(scope, signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                if entry["stored_at"] < expired_before:
+                    self._remove(entry_id)
+                    continue
+                similarity = 1.0 if entry["normalized"] == normalized else jaccard(shingle_set, entry["shingles"])
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None or best_similarity < self.threshold:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id]["response"], best_similarity
+
+    def store(self, model: str, context_hash: str, question: str, response: Dict,
+              tenant: str = ANONYMOUS_TENANT) -> None:
+        normalized = normalize_question(question)
+        shingle_set = char_shingles(normalized)
+        signature = minhash_signature(shingle_set)
+        scope = (tenant, model, context_hash)
+        band_keys = self._band_keys(scope, signature)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "normalized": normalized,
+                "shingles": shingle_set,
+                "band_keys": band_keys,
+                "response": response,
+                "stored_at": time.monotonic()
+            }
+            for key in band_keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# Shared cache instance; only consulted when Config.SEMANTIC_CACHE_ENABLED
+semantic_cache = SemanticCache(
+    max_entries=Config.SEMANTIC_CACHE_MAX_ENTRIES,
+    threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+    ttl=Config.SEMANTIC_CACHE_TTL
+)
@@ -0,0 +1,263 @@
+import atexit
+import hashlib
+import hmac
+import logging
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Mapping, Optional, Set
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ANONYMOUS_TENANT = "anonymous"
+# Shared by tenants first seen after TENANT_MAX_TRACKED distinct tenants
+OVERFLOW_TENANT = "overflow"
+# Buckets shared by unrelated callers; nothing per-caller (e.g. cached answers) may be shared within them
+SHARED_TENANTS = frozenset({ANONYMOUS_TENANT, OVERFLOW_TENANT})
+
+# Tenant of the request being handled on this thread/context
+current_tenant: ContextVar[str] = ContextVar("current_tenant", default=ANONYMOUS_TENANT)
+
+USAGE_FIELDS = ("requests", "upstream_calls", "prompt_tokens", "completion_tokens", "total_tokens")
+
+
+def _trusted_proxy(headers: Mapping[str, str]) -> bool:
+    """True when the request carries the shared secret of a trusted upstream proxy."""
+    if not Config.TENANT_PROXY_SECRET:
+        return False
+    provided = headers.get(Config.TENANT_SECRET_HEADER, "")
+    return hmac.compare_digest(provided.encode("utf-8"), Config.TENANT_PROXY_SECRET.encode("utf-8"))
+
+
+def resolve_tenant(headers: Mapping[str, str]) -> str:
+    """
+    Identify the caller from request headers.
+
+    The tenant is derived from the API key, hashed so raw keys never end up
+    in memory snapshots or the usage database. An explicit tenant header is
+    only accepted from a trusted proxy (``TENANT_PROXY_SECRET``), so callers
+    cannot claim another tenant's weight or usage. Tenants beyond
+    ``TENANT_MAX_TRACKED`` share one overflow bucket.
+    """
+    tenant = ""
+    if _trusted_proxy(headers):
+        tenant = headers.get(Config.TENANT_HEADER, "").strip()[:64]
+
+    if not tenant:
+        api_key = headers.get("X-API-Key", "").strip()
+        if not api_key:
+            authorization = headers.get("Authorization", "")
+            if authorization.lower().startswith("bearer "):
+                api_key = authorization[7:].strip()
+        if api_key:
+            tenant = "key-" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+    if not tenant:
+        return ANONYMOUS_TENANT
+    return tenant_registry.admit(tenant)
+
+
+def _parse_weights(spec: str) -> Dict[str, float]:
+    weights = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            weights[name.strip()] = max(0.01, float(value))
+        except ValueError:
+            logger.warning("Ignoring invalid tenant weight: %s", item)
+    return weights
+
+
+_TENANT_WEIGHTS = _parse_weights(Config.TENANT_WEIGHTS)
+
+
+def tenant_weight(tenant: str) -> float:
+    """Relative share of upstream capacity for a tenant (default 1.0)."""
+    return _TENANT_WEIGHTS.get(tenant, 1.0)
+
+
+class UsageTracker:
+    """
+    Per-tenant request and token counters.
+
+    Counters are updated in memory on the request path. A background thread
+    periodically writes the accumulated deltas to SQLite in one transaction,
+    so the database sees one batched write per interval instead of one per
+    request.
+    """
+
+    def __init__(self, db_path: str = Config.USAGE_DB_PATH,
+                 flush_interval: float = Config.USAGE_FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._pending: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loaded = False
+        self.last_flush: Optional[float] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=10)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS tenant_usage ("
+            "tenant TEXT PRIMARY KEY, "
+            + ", ".join(f"{field} INTEGER NOT NULL DEFAULT 0" for field in USAGE_FIELDS)
+            + ", updated_at REAL)"
+        )
+        return connection
+
+    def _ensure_started(self) -> None:
+        """Load persisted totals and start the flush thread on first use."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            if not self._loaded:
+                self._load()
+            self._thread = threading.Thread(target=self._run, name="usage-flush", daemon=True)
+            self._thread.start()
+
+    def _load(self) -> None:
+        try:
+            with self._connect() as connection:
+                rows = connection.execute(f"SELECT tenant, {', '.join(USAGE_FIELDS)} FROM tenant_usage").fetchall()
+            for row in rows:
+                self._totals[row[0]] = dict(zip(USAGE_FIELDS, row[1:]))
+        except sqlite3.Error as e:
+            logger.error("Failed to load tenant usage from %s: %s", self.db_path, e)
+        self._loaded = True
+
+    def _add(self, tenant: str, deltas: Dict[str, int]) -> None:
+        self._ensure_started()
+        with self._lock:
+            totals = self._totals.setdefault(tenant, dict.fromkeys(USAGE_FIELDS, 0))
+            pending = self._pending.setdefault(tenant, dict.fromkeys(USAGE_FIELDS, 0))
+            for field, value in deltas.items():
+                totals[field] += value
+                pending[field] += value
+
+    def record_request(self, tenant: str) -> None:
+        self._add(tenant, {"requests": 1})
+
+    def record_usage(self, tenant: str, usage: Optional[Dict]) -> None:
+        """Add one upstream call and its ``usage`` token counts."""
+        usage = usage or {}
+        self._add(tenant, {
+            "upstream_calls": 1,
+            "prompt_tokens": int(usage.get("prompt_tokens", 0) or 0),
+            "completion_tokens": int(usage.get("completion_tokens", 0) or 0),
+            "total_tokens": int(usage.get("total_tokens", 0) or 0)
+        })
+
+    def flush(self) -> int:
+        """Write pending deltas to SQLite; returns the number of tenants written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            now = time.time()
+            rows = [(tenant, *(values[field] for field in USAGE_FIELDS), now) for tenant, values in pending.items()]
+            updates = ", ".join(f"{field} = {field} + excluded.{field}" for field in USAGE_FIELDS)
+            try:
+                with self._connect() as connection:
+                    connection.executemany(
+                        f"INSERT INTO tenant_usage (tenant, {', '.join(USAGE_FIELDS)}, updated_at) "
+                        f"VALUES ({', '.join('?' * (len(USAGE_FIELDS) + 2))}) "
+                        f"ON CONFLICT(tenant) DO UPDATE SET {updates}, updated_at = excluded.updated_at",
+                        rows
+                    )
+            except sqlite3.Error as e:
+                logger.error("Failed to flush tenant usage to %s: %s", self.db_path, e)
+                # Put the deltas back so they are retried on the next flush
+                with self._lock:
+                    for tenant, values in pending.items():
+                        merged = self._pending.setdefault(tenant, dict.fromkeys(USAGE_FIELDS, 0))
+                        for field in USAGE_FIELDS:
+                            merged[field] += values[field]
+                return 0
+
+            self.last_flush = now
+            logger.debug("Flushed usage for %s tenants", len(rows))
+            return len(rows)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    def tenants(self) -> Set[str]:
+        """Tenants with recorded usage, including those loaded from the database."""
+        self._ensure_started()
+        with self._lock:
+            return set(self._totals)
+
+    def snapshot(self, tenant: Optional[str] = None) -> Dict:
+        self._ensure_started()
+        with self._lock:
+            if tenant is not None:
+                totals = {tenant: dict(self._totals.get(tenant, dict.fromkeys(USAGE_FIELDS, 0)))}
+            else:
+                totals = {name: dict(values) for name, values in self._totals.items()}
+            pending = sum(1 for values in self._pending.values() if any(values.values()))
+        return {
+            "tenants": totals,
+            "pending_flush": pending,
+            "last_flush": self.last_flush,
+            "flush_interval": self.flush_interval
+        }
+
+
+class TenantRegistry:
+    """
+    Bounded set of tenants that get their own scheduling and usage entry.
+
+    Configured tenants (``TENANT_WEIGHTS``) are always admitted. Others are
+    admitted until ``max_tenants`` distinct ones are known, counting those
+    already in the usage database; later ones map to ``OVERFLOW_TENANT``.
+    This keeps per-tenant maps and database rows bounded when callers send
+    arbitrary keys.
+    """
+
+    def __init__(self, max_tenants: int, configured: Iterable[str] = ()):
+        self.max_tenants = max_tenants
+        self._configured = frozenset(configured) | {ANONYMOUS_TENANT, OVERFLOW_TENANT}
+        self._known: Optional[Set[str]] = None
+        self._lock = threading.Lock()
+        self.overflowed = 0
+
+    def admit(self, tenant: str) -> str:
+        if tenant in self._configured:
+            return tenant
+        with self._lock:
+            if self._known is None:
+                self._known = set(usage_tracker.tenants()) - self._configured
+            if tenant in self._known:
+                return tenant
+            if len(self._known) < self.max_tenants:
+                self._known.add(tenant)
+                return tenant
+            if not self.overflowed:
+                logger.warning("Tracking limit of %s tenants reached; new tenants share '%s'",
+                               self.max_tenants, OVERFLOW_TENANT)
+            self.overflowed += 1
+        return OVERFLOW_TENANT
+
+
+# Shared tracker for this process
+usage_tracker = UsageTracker()
+atexit.register(usage_tracker.stop)
+
+tenant_registry = TenantRegistry(Config.TENANT_MAX_TRACKED, _TENANT_WEIGHTS)
@@ -0,0 +1,262 @@
+import codecs
+import logging
+import re
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+from config import Config
+
+try:
+    import charset_normalizer
+except ImportError:  # Optional dependency (normally installed with requests)
+    charset_normalizer = None
+
+logger = logging.getLogger(__name__)
+
+_BREAK_RE = re.compile(r"\n\s*\n|\n|(?<=[.!?])\s")
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Shorter non-UTF-8 samples are decoded with the fallback encoding
+_MIN_DETECT_BYTES = 512
+
+# Characters counted per split() call when counting words in a long string
+_COUNT_SLICE = 64 * 1024
+
+
+class ChunkBoundaries:
+    """
+    Incremental splitter into ``(start, end)`` spans of roughly ``chunk_chars``.
+
+    Spans end at the last paragraph, line or sentence break in the second
+    half of the window when there is one, so chunks rarely cut a sentence in
+    half. Only the text after the last emitted span is buffered.
+    """
+
+    def __init__(self, chunk_chars: int = Config.RETRIEVAL_CHUNK_CHARS):
+        self.chunk_chars = chunk_chars
+        self.spans: List[Tuple[int, int]] = []
+        self._buffer = ""
+        self._start = 0
+
+    def feed(self, text: str) -> None:
+        buffer = self._buffer + text if self._buffer else text
+        position = 0
+        half = self.chunk_chars // 2
+        # A full window is only cut once more text is known to follow it
+        while len(buffer) - position > self.chunk_chars:
+            end = position + self.chunk_chars
+            breaks = [match.end() for match in _BREAK_RE.finditer(buffer, position + half, end)]
+            if breaks:
+                end = breaks[-1]
+            self.spans.append((self._start, self._start + end - position))
+            self._start += end - position
+            position = end
+        self._buffer = buffer[position:]
+
+    def close(self) -> List[Tuple[int, int]]:
+        if self._buffer:
+            self.spans.append((self._start, self._start + len(self._buffer)))
+            self._start += len(self._buffer)
+            self._buffer = ""
+        return self.spans
+
+
+class TextStats:
+    """
+    Word, character and line counts plus a preview, accumulated chunk by chunk.
+
+    Words are whitespace-separated runs; a word split across two chunks is
+    counted once.
+    """
+
+    def __init__(self, preview_chars: int = 500):
+        self.preview_chars = preview_chars
+        self.words = 0
+        self.chars = 0
+        self.lines = 0
+        self._preview: List[str] = []
+        self._preview_len = 0
+        self._in_word = False
+        self._last_char = ""
+
+    def feed(self, text: str) -> None:
+        if not text:
+            return
+        for offset in range(0, len(text), _COUNT_SLICE):
+            piece = text[offset:offset + _COUNT_SLICE]
+            self.words += len(piece.split())
+            if self._in_word and not piece[0].isspace():
+                self.words -= 1
+            self._in_word = not piece[-1].isspace()
+        self.chars += len(text)
+        self.lines += text.count("\n")
+        self._last_char = text[-1]
+        if self._preview_len <= self.preview_chars:
+            needed = self.preview_chars + 1 - self._preview_len
+            self._preview.append(text[:needed])
+            self._preview_len += min(len(text), needed)
+
+    @property
+    def line_count(self) -> int:
+        """Lines, counting a final line without a trailing newline."""
+        return self.lines + (1 if self._last_char and self._last_char != "\n" else 0)
+
+    @property
+    def preview(self) -> str:
+        preview = "".join(self._preview)
+        if len(preview) > self.preview_chars:
+            return preview[:self.preview_chars] + "..."
+        return preview
+
+
+class TextPipeline:
+    """
+    One pass over text producing the content, its statistics and chunk spans.
+
+    Counting and chunking keep a bounded amount of state, but the decoded
+    content itself is kept and returned because callers send it upstream as
+    context and hash it for precomputed summaries; its size is bounded by
+    ``MAX_FILE_SIZE``, not by the pipeline.
+    """
+
+    def __init__(self, chunk_chars: int = Config.RETRIEVAL_CHUNK_CHARS, preview_chars: int = 500):
+        self.stats = TextStats(preview_chars)
+        self.chunks = ChunkBoundaries(chunk_chars)
+        self._parts: List[str] = []
+
+    def feed(self, text: str) -> None:
+        self._parts.append(text)
+        self.stats.feed(text)
+        self.chunks.feed(text)
+
+    def result(self) -> Dict:
+        return {
+            "content": "".join(self._parts),
+            "word_count": self.stats.words,
+            "char_count": self.stats.chars,
+            "line_count": self.stats.line_count,
+            "preview": self.stats.preview,
+            "chunks": self.chunks.close()
+        }
+
+
+def count_words(text: Optional[str]) -> int:
+    """Count whitespace-separated words without splitting the whole text at once."""
+    if not text:
+        return 0
+    stats = TextStats(preview_chars=0)
+    stats.feed(text)
+    return stats.words
+
+
+def _bom_encoding(head: bytes) -> Optional[str]:
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Best guess for non-UTF-8 text, falling back to ``TEXT_FALLBACK_ENCODING``.
+
+    Detectors often cannot tell Western code pages apart (cp1250 vs cp1252),
+    so the fallback encoding wins whenever it fits the sample as well as the
+    top candidate. Samples too short for a reliable guess, or with no
+    non-ASCII bytes to go on, use the fallback: the caller already knows the
+    text is not ASCII, so an "ascii" guess would only turn every later
+    non-ASCII byte into U+FFFD.
+    """
+    fallback = Config.TEXT_FALLBACK_ENCODING
+    if charset_normalizer is None or len(sample) < _MIN_DETECT_BYTES or max(sample) < 0x80:
+        return fallback
+
+    matches = list(charset_normalizer.from_bytes(sample))
+    if not matches or codecs.lookup(matches[0].encoding).name == "ascii":
+        return fallback
+    fallback_name = codecs.lookup(fallback).name
+    for match in matches:
+        if match.chaos <= matches[0].chaos and codecs.lookup(match.encoding).name == fallback_name:
+            return fallback
+    return matches[0].encoding
+
+
+def _read_chunks(stream: BinaryIO, chunk_size: int) -> Iterable[bytes]:
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+class _UndecodableBytes(ValueError):
+    """A strict decode failed; ``offset`` is roughly where in the stream."""
+
+    def __init__(self, error: UnicodeDecodeError, offset: int):
+        super().__init__(str(error))
+        self.error = error
+        self.offset = offset
+
+
+def _decode_into(pipeline: TextPipeline, first: bytes, stream: BinaryIO,
+                 encoding: str, errors: str, chunk_size: int) -> None:
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    offset = 0
+    try:
+        pipeline.feed(decoder.decode(first))
+        offset += len(first)
+        for chunk in _read_chunks(stream, chunk_size):
+            pipeline.feed(decoder.decode(chunk))
+            offset += len(chunk)
+        pipeline.feed(decoder.decode(b"", final=True))
+    except UnicodeDecodeError as e:
+        raise _UndecodableBytes(e, offset + e.start) from e
+
+
+def decode_stream(stream: BinaryIO,
+                  chunk_chars: int = Config.RETRIEVAL_CHUNK_CHARS,
+                  chunk_size: int = Config.UPLOAD_READ_CHUNK_SIZE) -> Dict:
+    """
+    Decode a text stream chunk by chunk and collect its statistics.
+
+    A byte order mark selects the encoding; otherwise UTF-8 is tried first.
+    If the bytes are not valid UTF-8 the stream is rewound and decoded with
+    the encoding detected from the chunk around the first invalid byte
+    (the head of a file is often plain ASCII and says nothing about the
+    encoding), replacing undecodable bytes. Returns the
+    ``TextPipeline.result()`` dict plus ``encoding``.
+    """
+    start = stream.tell() if stream.seekable() else None
+    head = stream.read(chunk_size)
+    encoding = _bom_encoding(head) or "utf-8"
+
+    pipeline = TextPipeline(chunk_chars)
+    try:
+        _decode_into(pipeline, head, stream, encoding, "strict", chunk_size)
+    except _UndecodableBytes as e:
+        if encoding != "utf-8" or start is None:
+            raise e.error from None
+        stream.seek(start + max(0, e.offset - chunk_size // 2))
+        encoding = detect_encoding(stream.read(chunk_size))
+        stream.seek(start)
+        head = stream.read(chunk_size)
+        logger.info("Text is not valid UTF-8, decoding as %s", encoding)
+        pipeline = TextPipeline(chunk_chars)
+        _decode_into(pipeline, head, stream, encoding, "replace", chunk_size)
+
+    result = pipeline.result()
+    result["encoding"] = encoding
+    return result
+
+
+def analyze_text(parts: Iterable[str], chunk_chars: int = Config.RETRIEVAL_CHUNK_CHARS) -> Dict:
+    """Run already-decoded text parts (e.g. PDF pages) through the pipeline."""
+    pipeline = TextPipeline(chunk_chars)
+    for part in parts:
+        pipeline.feed(part)
+    return pipeline.result()
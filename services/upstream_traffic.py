@@ -0,0 +1,23 @@
+import atexit
+import logging
+from typing import Optional
+from config import Config
+from utils.traffic_log import TrafficLogWriter, TrafficReplay
+
+logger = logging.getLogger(__name__)
+
+# Set according to UPSTREAM_TRAFFIC_MODE; both stay None in normal operation
+traffic_recorder: Optional[TrafficLogWriter] = None
+traffic_replay: Optional[TrafficReplay] = None
+
+if Config.UPSTREAM_TRAFFIC_MODE == "record":
+    traffic_recorder = TrafficLogWriter(Config.UPSTREAM_TRAFFIC_LOG, key=Config.UPSTREAM_TRAFFIC_KEY,
+                                        flush_every=Config.UPSTREAM_TRAFFIC_FLUSH_RECORDS)
+    atexit.register(traffic_recorder.close)
+    logger.info("Recording upstream traffic to %s", Config.UPSTREAM_TRAFFIC_LOG)
+elif Config.UPSTREAM_TRAFFIC_MODE == "replay":
+    traffic_replay = TrafficReplay(Config.UPSTREAM_TRAFFIC_LOG, key=Config.UPSTREAM_TRAFFIC_KEY,
+                                   speed=Config.UPSTREAM_REPLAY_SPEED)
+    logger.info("Replaying upstream traffic from %s", Config.UPSTREAM_TRAFFIC_LOG)
+elif Config.UPSTREAM_TRAFFIC_MODE:
+    logger.warning("Unknown UPSTREAM_TRAFFIC_MODE %r, calling the Groq API", Config.UPSTREAM_TRAFFIC_MODE)
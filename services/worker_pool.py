@@ -0,0 +1,68 @@
+import atexit
+import contextvars
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_io_executor: Optional[ThreadPoolExecutor] = None
+_cpu_executor: Optional[Executor] = None
+
+
+def io_executor() -> ThreadPoolExecutor:
+    """Shared thread pool for concurrent upstream (network-bound) calls."""
+    global _io_executor
+    if _io_executor is None:
+        with _lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=Config.IO_WORKERS, thread_name_prefix="upstream"
+                )
+    return _io_executor
+
+
+def cpu_executor() -> Executor:
+    """
+    Shared pool for CPU-bound work such as PDF parsing.
+
+    With ``EXTRACTION_EXECUTOR=process`` (default) work runs in spawned
+    processes so parsing is not serialized by the GIL; ``thread`` keeps it
+    in-process for environments with a single CPU. Spawned workers re-import
+    the entry module as ``__mp_main__``, so entry points must not build the
+    app for that name (see ``main.py``).
+    """
+    global _cpu_executor
+    if _cpu_executor is None:
+        with _lock:
+            if _cpu_executor is None:
+                if Config.EXTRACTION_EXECUTOR == "process":
+                    # spawn avoids forking a multi-threaded server process
+                    _cpu_executor = ProcessPoolExecutor(
+                        max_workers=Config.EXTRACTION_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    _cpu_executor = ThreadPoolExecutor(
+                        max_workers=Config.EXTRACTION_WORKERS, thread_name_prefix="extract"
+                    )
+    return _cpu_executor
+
+
+def submit_io(fn: Callable, *args, **kwargs) -> Future:
+    """Submit to the I/O pool, carrying context variables such as the current tenant."""
+    context = contextvars.copy_context()
+    return io_executor().submit(context.run, fn, *args, **kwargs)
+
+
+def _shutdown() -> None:
+    for executor in (_io_executor, _cpu_executor):
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown)
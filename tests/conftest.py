@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Keep module-level singletons (usage tracker, logging) away from the working tree
+os.environ.setdefault("USAGE_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="usage-test-"), "usage.db"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
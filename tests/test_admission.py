@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from services.admission import AdmissionController, AdmissionRejected
+
+MODEL = "test-model"
+
+
+def make_controller(**overrides) -> AdmissionController:
+    settings = dict(initial_limit=4, min_limit=1, max_limit=32, max_queue=16,
+                    max_queue_wait=5.0, latency_target_ms=1000.0, decrease_factor=0.5)
+    settings.update(overrides)
+    return AdmissionController(**settings)
+
+
+def wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_slot_is_released_when_the_call_raises():
+    controller = make_controller()
+    with pytest.raises(RuntimeError):
+        with controller.slot(MODEL):
+            raise RuntimeError("upstream failed")
+    state = controller._state(MODEL)
+    assert state.in_flight == 0
+    assert state.admitted == 1
+
+
+def test_timed_out_waiter_leaves_the_queue():
+    controller = make_controller(initial_limit=1, max_queue_wait=0.05)
+    controller.acquire(MODEL)
+    with pytest.raises(AdmissionRejected):
+        controller.acquire(MODEL)
+    state = controller._state(MODEL)
+    assert state.waiters == []
+    assert state.in_flight == 1
+    controller.release(MODEL)
+    assert state.in_flight == 0
+    # The freed slot is usable again
+    with controller.slot(MODEL):
+        pass
+
+
+def test_limit_is_cut_once_per_smoothed_round_trip():
+    controller = make_controller(initial_limit=16)
+    state = controller._state(MODEL)
+    state.latency_ms = 200.0
+    for _ in range(8):
+        controller.acquire(MODEL)
+    for _ in range(8):
+        controller.release(MODEL, overloaded=True)
+    assert state.limit == 8.0
+
+    state.last_decrease -= 0.2
+    controller.acquire(MODEL)
+    controller.release(MODEL, overloaded=True)
+    assert state.limit == 4.0
+
+
+def test_fast_calls_grow_the_limit_additively():
+    controller = make_controller(initial_limit=4)
+    controller.acquire(MODEL)
+    controller.release(MODEL, latency_ms=10.0)
+    assert controller._state(MODEL).limit == pytest.approx(4.25)
+
+
+def test_light_tenant_is_served_ahead_of_heavy_backlog():
+    controller = make_controller(initial_limit=1)
+    state = controller._state(MODEL)
+    controller.acquire(MODEL, tenant="heavy")
+
+    order = []
+    order_lock = threading.Lock()
+
+    def call(tenant):
+        controller.acquire(MODEL, tenant=tenant)
+        with order_lock:
+            order.append(tenant)
+        controller.release(MODEL)
+
+    threads = []
+    for tenant in ["heavy"] * 5 + ["light"]:
+        thread = threading.Thread(target=call, args=(tenant,))
+        thread.start()
+        threads.append(thread)
+        queued = len(threads)
+        wait_for(lambda: state.waiting == queued)
+
+    controller.release(MODEL)
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order[0] == "light"
+    assert order.count("heavy") == 5
+
+
+def test_full_queue_sheds_with_retry_after():
+    controller = make_controller(initial_limit=1, max_queue=0)
+    controller.acquire(MODEL)
+    with pytest.raises(AdmissionRejected) as excinfo:
+        controller.acquire(MODEL)
+    assert excinfo.value.retry_after >= 1
+    assert controller._state(MODEL).shed == 1
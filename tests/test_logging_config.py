@@ -0,0 +1,30 @@
+import logging
+
+from utils.logging_config import DebugSamplingFilter
+
+
+def debug_record(msg, name="app"):
+    return logging.LogRecord(name, logging.DEBUG, __file__, 1, msg, None, None)
+
+
+def test_keeps_every_nth_debug_record_per_template():
+    sampler = DebugSamplingFilter(0.25)
+    kept = [sampler.filter(debug_record("cache miss for %s")) for _ in range(8)]
+    assert kept == [True, False, False, False, True, False, False, False]
+    assert sampler.filter(logging.LogRecord("app", logging.INFO, __file__, 1, "x", None, None))
+
+
+def test_counters_stay_bounded_for_unique_messages():
+    sampler = DebugSamplingFilter(0.1, max_keys=16)
+    for i in range(1000):
+        sampler.filter(debug_record(f"request {i} done"))
+    assert len(sampler._counters) == 16
+
+
+def test_recently_used_template_survives_eviction():
+    sampler = DebugSamplingFilter(0.5, max_keys=2)
+    assert sampler.filter(debug_record("hot"))
+    sampler.filter(debug_record("cold 1"))
+    assert not sampler.filter(debug_record("hot"))
+    sampler.filter(debug_record("cold 2"))
+    assert sampler.filter(debug_record("hot"))
@@ -0,0 +1,58 @@
+import pytest
+
+from config import Config
+from services.groq_client import GroqClient
+
+# Two answers that say the same thing in different words
+PARAPHRASES = [
+    ("La fotosíntesis es el proceso mediante el cual las plantas convierten la luz solar, el agua y el "
+     "dióxido de carbono en glucosa y oxígeno. Ocurre en los cloroplastos gracias a la clorofila.",
+     "Las plantas realizan la fotosíntesis en sus cloroplastos: usan la clorofila para captar la luz del sol "
+     "y transformar agua y dióxido de carbono en glucosa, liberando oxígeno como subproducto."),
+    ("Python es un lenguaje de programación interpretado, de tipado dinámico y multiparadigma, muy usado en "
+     "ciencia de datos, automatización y desarrollo web por su sintaxis legible.",
+     "Python es un lenguaje interpretado con tipado dinámico. Su sintaxis clara lo hace popular para ciencia "
+     "de datos, desarrollo web y automatizar tareas; admite varios paradigmas."),
+    ("Para reducir la latencia de una API conviene cachear respuestas frecuentes, reutilizar conexiones HTTP "
+     "y limitar la concurrencia para no saturar el servicio.",
+     "Puedes bajar la latencia de tu API reutilizando conexiones, guardando en caché las respuestas más "
+     "frecuentes y limitando la concurrencia para evitar saturar el backend."),
+]
+
+# Answers on the same topic that do not agree
+DIFFERENT = [
+    ("La fotosíntesis es el proceso mediante el cual las plantas convierten la luz solar, el agua y el "
+     "dióxido de carbono en glucosa y oxígeno. Ocurre en los cloroplastos gracias a la clorofila.",
+     "La fotosíntesis tiene dos fases: la fase luminosa, en las membranas de los tilacoides, produce ATP y "
+     "NADPH; el ciclo de Calvin, en el estroma, fija el carbono en azúcares."),
+    ("La fotosíntesis es el proceso mediante el cual las plantas convierten la luz solar, el agua y el "
+     "dióxido de carbono en glucosa y oxígeno.",
+     "La respiración celular es el proceso inverso: las células oxidan glucosa en las mitocondrias para "
+     "obtener ATP, consumiendo oxígeno y liberando dióxido de carbono y agua."),
+    ("Python es un lenguaje de programación interpretado, de tipado dinámico y multiparadigma, muy usado en "
+     "ciencia de datos.",
+     "Java es un lenguaje compilado a bytecode, de tipado estático, muy usado en aplicaciones empresariales "
+     "y Android."),
+]
+
+
+@pytest.mark.parametrize("first, second", PARAPHRASES)
+def test_paraphrases_reach_agreement_threshold(first, second):
+    agreement, _ = GroqClient._agreement([first, second])
+    assert agreement >= Config.PRO_MODE_AGREEMENT_THRESHOLD
+
+
+@pytest.mark.parametrize("first, second", DIFFERENT)
+def test_different_answers_stay_below_threshold(first, second):
+    agreement, _ = GroqClient._agreement([first, second])
+    assert agreement < Config.PRO_MODE_AGREEMENT_THRESHOLD
+
+
+def test_empty_responses_do_not_agree():
+    assert GroqClient._agreement(["", ""])[0] == 0.0
+
+
+def test_representative_is_most_central_response():
+    first, second = PARAPHRASES[0]
+    _, representative = GroqClient._agreement([first, second, DIFFERENT[0][1]])
+    assert representative in (0, 1)
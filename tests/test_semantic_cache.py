@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+from services.semantic_cache import (SemanticCache, char_shingles, minhash_signature,
+                                     normalize_question)
+
+
+def test_normalize_question():
+    assert normalize_question("¿Qué es   Python?") == "que es python"
+    assert normalize_question("What's the GIL?") == "what is the gil"
+    assert normalize_question("I don't know") == "i do not know"
+
+
+def test_similar_question_hits_within_scope():
+    cache = SemanticCache()
+    cache.store("llama3-8b", "ctx", "What is Python?", {"content": "A language"}, tenant="acme")
+    hit = cache.lookup("llama3-8b", "ctx", "what is python", tenant="acme")
+    assert hit is not None
+    assert hit[0]["content"] == "A language"
+    assert cache.lookup("llama3-8b", "other-ctx", "what is python", tenant="acme") is None
+    assert cache.lookup("mixtral", "ctx", "what is python", tenant="acme") is None
+
+
+def test_tenants_do_not_share_entries():
+    cache = SemanticCache()
+    cache.store("llama3-8b", "ctx", "What is my account balance?", {"content": "42"}, tenant="acme")
+    assert cache.lookup("llama3-8b", "ctx", "What is my account balance?", tenant="globex") is None
+    assert cache.lookup("llama3-8b", "ctx", "What is my account balance?", tenant="acme") is not None
+
+
+def test_entries_expire_after_ttl():
+    cache = SemanticCache(ttl=0.0)
+    cache.store("llama3-8b", "ctx", "What is Python?", {"content": "A language"}, tenant="acme")
+    assert cache.lookup("llama3-8b", "ctx", "What is Python?", tenant="acme") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_bounds_entries():
+    cache = SemanticCache(max_entries=2)
+    for i, question in enumerate(["first question here", "second question here", "third question here"]):
+        cache.store("llama3-8b", "ctx", question, {"content": str(i)}, tenant="acme")
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup("llama3-8b", "ctx", "first question here", tenant="acme") is None
+
+
+def test_signature_is_stable_across_processes():
+    code = ("from services.semantic_cache import char_shingles, minhash_signature;"
+            "print(minhash_signature(char_shingles('what is python')))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    outputs = set()
+    for seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, env=env,
+                                capture_output=True, text=True, check=True)
+        outputs.add(result.stdout.strip())
+    assert outputs == {str(minhash_signature(char_shingles("what is python")))}
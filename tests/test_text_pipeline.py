@@ -0,0 +1,37 @@
+import io
+
+from config import Config
+from services.text_pipeline import count_words, decode_stream, detect_encoding
+
+
+def test_utf8_stream_across_chunk_boundaries():
+    data = ("añadir café " * 5000).encode("utf-8")
+    result = decode_stream(io.BytesIO(data), chunk_size=1001)
+    assert result["encoding"] == "utf-8"
+    assert result["content"] == data.decode("utf-8")
+    assert result["word_count"] == 10000
+
+
+def test_non_utf8_after_ascii_head_uses_fallback():
+    # A long ASCII head says nothing about the encoding; the cp1252 bytes
+    # that follow must not be replaced with U+FFFD
+    text = "ascii world " * 10000 + "café niño señal"
+    result = decode_stream(io.BytesIO(text.encode("cp1252")), chunk_size=64 * 1024)
+    assert "�" not in result["content"]
+    assert result["content"].endswith("café niño señal")
+
+
+def test_detect_encoding_ascii_sample_falls_back():
+    assert detect_encoding(b"plain ascii text " * 100) == Config.TEXT_FALLBACK_ENCODING
+
+
+def test_bom_selects_encoding():
+    data = "hola mundo".encode("utf-16")
+    result = decode_stream(io.BytesIO(data))
+    assert result["encoding"] == "utf-16"
+    assert result["content"] == "hola mundo"
+
+
+def test_count_words_split_across_slices():
+    assert count_words("uno dos  tres\ncuatro") == 4
+    assert count_words("") == 0
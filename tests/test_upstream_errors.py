@@ -0,0 +1,66 @@
+import pytest
+import requests
+
+import services.groq_client as groq_client
+from services.groq_client import GroqClient
+from utils.traffic_log import BAD_RESPONSE, CONNECTION_ERROR
+
+PAYLOAD = {"model": "llama3-8b-8192", "messages": [{"role": "user", "content": "hola"}]}
+
+
+class Recorder:
+    def __init__(self):
+        self.statuses = []
+
+    def record(self, payload, status, latency_ms, response=None, retry_after=None):
+        self.statuses.append(status)
+
+
+class Replay:
+    def __init__(self, status):
+        self.status = status
+
+    def match(self, payload):
+        return {"status": self.status}
+
+    def delay_s(self, entry):
+        return 0.0
+
+
+def fake_response(status_code, body):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    return response
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = Recorder()
+    monkeypatch.setattr(groq_client, "traffic_recorder", recorder)
+    return recorder
+
+
+def test_invalid_json_body_is_a_bad_response(monkeypatch, recorder):
+    monkeypatch.setattr(requests, "post", lambda *args, **kwargs: fake_response(200, b'{"choices": ['))
+    outcome = {"latency_ms": None, "overloaded": False}
+    with pytest.raises(Exception, match="Invalid response"):
+        GroqClient()._send_request(PAYLOAD, outcome)
+    assert recorder.statuses == [BAD_RESPONSE]
+    assert not outcome["overloaded"]
+
+
+def test_connection_failure_is_a_connection_error(monkeypatch, recorder):
+    def refuse(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("refused")
+
+    monkeypatch.setattr(requests, "post", refuse)
+    with pytest.raises(Exception, match="Failed to communicate"):
+        GroqClient()._send_request(PAYLOAD, {"latency_ms": None, "overloaded": False})
+    assert recorder.statuses == [CONNECTION_ERROR]
+
+
+def test_replayed_bad_response_raises_the_same_error(monkeypatch):
+    monkeypatch.setattr(groq_client, "traffic_replay", Replay(BAD_RESPONSE))
+    with pytest.raises(Exception, match="Invalid response"):
+        GroqClient()._send_request(PAYLOAD, {"latency_ms": None, "overloaded": False})
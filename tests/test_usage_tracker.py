@@ -0,0 +1,49 @@
+import sqlite3
+
+from services.tenants import USAGE_FIELDS, UsageTracker
+
+USAGE = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+
+
+def read_rows(db_path):
+    with sqlite3.connect(db_path) as connection:
+        rows = connection.execute(f"SELECT tenant, {', '.join(USAGE_FIELDS)} FROM tenant_usage").fetchall()
+    return {row[0]: dict(zip(USAGE_FIELDS, row[1:])) for row in rows}
+
+
+def make_tracker(tmp_path):
+    # A long interval keeps the background thread out of the way
+    return UsageTracker(db_path=str(tmp_path / "usage.db"), flush_interval=3600)
+
+
+def test_flush_writes_pending_deltas_once(tmp_path):
+    tracker = make_tracker(tmp_path)
+    tracker.record_request("acme")
+    tracker.record_usage("acme", USAGE)
+
+    assert tracker.flush() == 1
+    assert tracker.flush() == 0
+    rows = read_rows(tracker.db_path)
+    assert rows["acme"]["requests"] == 1
+    assert rows["acme"]["total_tokens"] == 15
+
+
+def test_repeated_flushes_accumulate_with_upsert(tmp_path):
+    tracker = make_tracker(tmp_path)
+    for _ in range(3):
+        tracker.record_usage("acme", USAGE)
+        tracker.flush()
+    assert read_rows(tracker.db_path)["acme"]["upstream_calls"] == 3
+    assert tracker.snapshot("acme")["tenants"]["acme"]["upstream_calls"] == 3
+
+
+def test_totals_survive_a_restart(tmp_path):
+    tracker = make_tracker(tmp_path)
+    tracker.record_usage("acme", USAGE)
+    tracker.stop()
+
+    restarted = make_tracker(tmp_path)
+    restarted.record_usage("acme", USAGE)
+    restarted.flush()
+    assert restarted.snapshot("acme")["tenants"]["acme"]["prompt_tokens"] == 20
+    assert read_rows(restarted.db_path)["acme"]["prompt_tokens"] == 20
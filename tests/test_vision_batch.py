@@ -0,0 +1,51 @@
+import io
+
+import pytest
+
+from app import create_app
+from benchmarks.fixtures import make_png
+from config import Config
+from services.groq_client import GroqClient
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(Config, "GROQ_API_KEY", "gsk_" + "x" * 48)
+    return create_app().test_client()
+
+
+def post_batch(client, monkeypatch, responses):
+    monkeypatch.setattr(GroqClient, "vision_batch", lambda self, prompts, model=None: responses)
+    images = [(io.BytesIO(make_png(16, 16, seed=i)), f"i{i}.png") for i in range(len(responses))]
+    return client.post("/chat/vision/batch", data={"images": images}, content_type="multipart/form-data")
+
+
+def failure(error_type, retry_after=None):
+    result = {"success": False, "error": f"{error_type} failure", "error_type": error_type, "latency_ms": 1.0}
+    if retry_after is not None:
+        result["retry_after"] = retry_after
+    return result
+
+
+def test_partial_failure_is_reported_per_item(client, monkeypatch):
+    ok = {"success": True, "content": "a cat", "usage": {}, "finish_reason": "stop", "latency_ms": 1.0}
+    response = post_batch(client, monkeypatch, [ok, failure("upstream")])
+    assert response.status_code == 200
+    assert [item["success"] for item in response.get_json()["results"]] == [True, False]
+
+
+def test_all_rate_limited_returns_429_with_longest_retry(client, monkeypatch):
+    response = post_batch(client, monkeypatch, [failure("rate_limited", 2.0), failure("rate_limited", 7.5)])
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "8"
+
+
+def test_all_shed_returns_503(client, monkeypatch):
+    response = post_batch(client, monkeypatch, [failure("overloaded", 3.0), failure("rate_limited", 1.0)])
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+
+
+def test_all_failed_upstream_returns_502(client, monkeypatch):
+    response = post_batch(client, monkeypatch, [failure("upstream"), failure("rate_limited", 1.0)])
+    assert response.status_code == 502
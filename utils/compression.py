@@ -0,0 +1,110 @@
+import gzip
+import logging
+import threading
+import time
+from typing import Dict, Tuple
+from flask import Request, Response
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = frozenset({
+    "application/json",
+    "application/javascript",
+    "text/html",
+    "text/plain",
+    "text/css",
+})
+
+
+class CompressionStats:
+    """Per-encoding totals of compressed responses, for the health endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._encodings: Dict[str, Dict[str, float]] = {}
+        self.skipped_small = 0
+
+    def record(self, encoding: str, original: int, compressed: int, cpu_ms: float) -> None:
+        with self._lock:
+            totals = self._encodings.setdefault(
+                encoding, {"responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_ms": 0.0}
+            )
+            totals["responses"] += 1
+            totals["bytes_in"] += original
+            totals["bytes_out"] += compressed
+            totals["cpu_ms"] += cpu_ms
+
+    def record_skipped(self) -> None:
+        with self._lock:
+            self.skipped_small += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            encodings = {}
+            for encoding, totals in self._encodings.items():
+                encodings[encoding] = {
+                    "responses": totals["responses"],
+                    "bytes_in": totals["bytes_in"],
+                    "bytes_out": totals["bytes_out"],
+                    "ratio": round(totals["bytes_in"] / totals["bytes_out"], 2) if totals["bytes_out"] else None,
+                    "cpu_ms": round(totals["cpu_ms"], 2),
+                    "cpu_ms_per_response": round(totals["cpu_ms"] / totals["responses"], 3)
+                }
+            return {"encodings": encodings, "skipped_small": self.skipped_small}
+
+
+class ResponseCompressor:
+    """
+    Compress eligible responses with the best encoding the client accepts.
+
+    Only complete (non-streamed) responses with a text-like mimetype and a
+    body of at least ``min_size`` bytes are compressed. Brotli is offered
+    when the ``brotli`` package is installed; otherwise gzip.
+    """
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+        self.stats = CompressionStats()
+
+    def _compress(self, encoding: str, data: bytes) -> Tuple[bytes, float]:
+        started = time.thread_time()
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+        return compressed, (time.thread_time() - started) * 1000
+
+    def __call__(self, request: Request, response: Response) -> Response:
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.is_streamed or response.direct_passthrough
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            self.stats.record_skipped()
+            return response
+
+        compressed, cpu_ms = self._compress(encoding, data)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        self.stats.record(encoding, len(data), len(compressed), cpu_ms)
+        logger.debug("Compressed %s bytes to %s with %s in %.2f ms", len(data), len(compressed), encoding, cpu_ms)
+        return response
@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Union
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Used for ``jsonify``, ``request.get_json`` and ``current_app.json``.
+    Keys are not sorted (orjson keeps insertion order). Values orjson cannot
+    encode natively go through Flask's default hook, and anything it still
+    rejects (e.g. integers beyond 64 bits) falls back to the stdlib encoder.
+    """
+
+    def _options(self, **kwargs: Any) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("indent") or kwargs.get("sort_keys"):
+            options |= orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options(**kwargs)).decode("utf-8")
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self._app.debug if self.compact is None else not self.compact
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._options(indent=pretty))
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def configure_json(app: Flask, provider: str = "auto") -> str:
+    """
+    Install the JSON provider named by ``provider`` ("auto", "orjson" or
+    "std") on ``app`` and return the name of the one in use.
+    """
+    if provider not in ("auto", "orjson", "std"):
+        logger.warning("Unknown JSON_PROVIDER %r, using the standard library", provider)
+        provider = "std"
+    if provider != "std" and orjson is not None:
+        app.json = OrjsonProvider(app)
+        return "orjson"
+    if provider == "orjson":
+        logger.warning("JSON_PROVIDER=orjson but orjson is not installed, using the standard library")
+    return "std"
@@ -0,0 +1,182 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+# Attributes every LogRecord carries; anything else was passed via ``extra=``
+_STANDARD_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+) | {"message", "asctime"}
+
+# Renders tracebacks on the calling thread while the frames are still alive
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Render log records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG records.
+
+    Sampling is deterministic per message template (the unformatted ``msg``),
+    so a rate of 0.1 keeps every 10th occurrence of each debug message.
+    Records of level INFO and above always pass.
+
+    Counters are kept for the ``max_keys`` most recently seen templates, so
+    pre-formatted messages (f-strings) cannot grow the table without bound;
+    an evicted template starts counting again from its next occurrence.
+    """
+
+    def __init__(self, rate: float, max_keys: int = 1024):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+        self._every = int(round(1 / self.rate)) if self.rate > 0 else 0
+        self._max_keys = max(1, max_keys)
+        self._counters: "OrderedDict[tuple, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        if self._every == 0:
+            return False
+
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counters.get(key, 0)
+            self._counters[key] = count + 1
+            self._counters.move_to_end(key)
+            if len(self._counters) > self._max_keys:
+                self._counters.popitem(last=False)
+        return count % self._every == 0
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that drops records instead of blocking when the queue is full.
+
+    Records are enqueued unformatted so the listener's formatter does the
+    work: only the traceback is rendered here (into ``exc_text``), because
+    it references frames that will not outlive the call.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if not record.exc_info:
+            return record
+        record = copy.copy(record)
+        if not record.exc_text:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_module_levels(spec: str) -> Dict[str, int]:
+    """Parse ``"services.groq_client=INFO,urllib3=WARNING"`` into a level map."""
+    levels = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item or "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        level_value = logging.getLevelName(level.strip().upper())
+        if isinstance(level_value, int):
+            levels[name.strip()] = level_value
+    return levels
+
+
+def configure_logging(log_format: str = "text",
+                      level: str = "DEBUG",
+                      module_levels: str = "",
+                      debug_sample_rate: float = 1.0,
+                      queue_size: int = 10000) -> None:
+    """
+    Configure root logging with a queue-based handler.
+
+    Request threads only enqueue records (rendering tracebacks, if any);
+    message formatting and I/O happen on a background listener thread. An
+    unknown ``level`` falls back to INFO. Safe to call more than once.
+    """
+    global _listener
+
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+        stream_handler = logging.StreamHandler()
+        if log_format == "json":
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+        queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        queue_handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        level_value = logging.getLevelName(level.upper())
+        if not isinstance(level_value, int):
+            level_value = logging.INFO
+        root.setLevel(level_value)
+
+        for name, module_level in parse_module_levels(module_levels).items():
+            logging.getLogger(name).setLevel(module_level)
+
+        _listener = logging.handlers.QueueListener(
+            queue_handler.queue, stream_handler, respect_handler_level=True
+        )
+        _listener.start()
+
+        if level_value == logging.INFO and level.upper() != "INFO":
+            logging.getLogger(__name__).warning("Unknown LOG_LEVEL %r, using INFO", level)
+
+
+def _stop_listener() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
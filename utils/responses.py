@@ -0,0 +1,21 @@
+import math
+from flask import jsonify
+
+
+def rate_limited_response(error):
+    """Build a 429 response that forwards the upstream Retry-After hint."""
+    headers = {}
+    if getattr(error, "retry_after", None):
+        headers["Retry-After"] = str(math.ceil(error.retry_after))
+    return jsonify({
+        "error": "Rate limited",
+        "message": str(error)
+    }), 429, headers
+
+
+def service_overloaded_response(error):
+    """Build a 503 response telling the client when to retry."""
+    return jsonify({
+        "error": "Service overloaded",
+        "message": str(error)
+    }), 503, {"Retry-After": str(math.ceil(error.retry_after))}
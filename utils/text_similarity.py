@@ -0,0 +1,30 @@
+import re
+from typing import FrozenSet, Iterable, List
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, ignoring punctuation."""
+    return _WORD_RE.findall(text.lower())
+
+
+def content_terms(tokens: Iterable[str], min_length: int = 4, stem_length: int = 6) -> FrozenSet[str]:
+    """
+    Distinct content words, crudely stemmed.
+
+    Words shorter than ``min_length`` (articles, prepositions, most
+    stopwords) are dropped and the rest cut to ``stem_length`` characters,
+    so "planta"/"plantas" or "conexión"/"conexiones" count as one term.
+    Independently phrased answers share far more of these than of exact
+    word pairs.
+    """
+    return frozenset(token[:stem_length] for token in tokens if len(token) >= min_length)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two sets (1.0 when both are empty)."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
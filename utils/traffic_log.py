@@ -0,0 +1,291 @@
+"""
+Compact, anonymized log of upstream request/response pairs.
+
+The log is gzip-compressed JSON lines. The first line is a header; every
+other line is one exchange with its timing, status, the shape of the
+request and an anonymized response. Prompt text is never stored: requests
+are reduced to sizes plus a keyed fingerprint, and each word of a response
+is replaced by a keyed hash token, which keeps lengths and word repetition
+(what similarity checks and token counts depend on) without keeping the
+text.
+
+Fingerprints and tokens are HMACs under a secret key that is never written
+to the log, so they cannot be reversed by hashing candidate words. The
+header only carries a key id, which tells replay whether its key matches.
+
+This module has no dependency on the app configuration so the benchmark
+tools can read logs before the app is imported.
+"""
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; a single process per log is then assumed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+# Statuses recorded when no usable HTTP response arrived
+NO_RESPONSE = 0  # Request timed out
+CONNECTION_ERROR = -1  # Connection refused, reset or otherwise failed
+BAD_RESPONSE = -2  # Successful status whose body was not valid JSON
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _message_text(message: Dict) -> Tuple[str, int]:
+    """Text of a chat message and the number of images it carries."""
+    content = message.get("content")
+    if isinstance(content, list):
+        text = " ".join(part.get("text", "") for part in content if part.get("type") == "text")
+        images = sum(1 for part in content if part.get("type") == "image_url")
+        return text, images
+    return content or "", 0
+
+
+def key_id(key: bytes) -> str:
+    """Identifier of a key that reveals nothing about it."""
+    return hmac.new(key, b"traffic-log-key-id", hashlib.sha256).hexdigest()[:12]
+
+
+def fingerprint(payload: Dict, key: bytes) -> str:
+    """Keyed hash of the model and prompt, for matching identical requests."""
+    digest = hmac.new(key, digestmod=hashlib.sha256)
+    digest.update(str(payload.get("model", "")).encode("utf-8"))
+    for message in payload.get("messages", []):
+        text, images = _message_text(message)
+        digest.update(f"\x1f{message.get('role')}:{images}:{text}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def payload_shape(payload: Dict) -> Dict:
+    """Sizes describing a request without its content."""
+    messages = payload.get("messages", [])
+    prompt_chars = 0
+    images = 0
+    for message in messages:
+        text, message_images = _message_text(message)
+        prompt_chars += len(text)
+        images += message_images
+    return {
+        "messages": len(messages),
+        "prompt_chars": prompt_chars,
+        "images": images,
+        "max_tokens": payload.get("max_tokens"),
+        "stream": bool(payload.get("stream"))
+    }
+
+
+def anonymize_text(text: str, key: bytes) -> str:
+    """Replace every word with a keyed hash token; whitespace and punctuation are kept."""
+    tokens: Dict[str, str] = {}
+
+    def replace(match: re.Match) -> str:
+        word = match.group(0).lower()
+        token = tokens.get(word)
+        if token is None:
+            token = "w" + hmac.new(key, word.encode("utf-8"), hashlib.sha256).hexdigest()[:6]
+            tokens[word] = token
+        return token
+
+    return _WORD_RE.sub(replace, text)
+
+
+def read_log(path: str) -> Tuple[Dict, List[Dict]]:
+    """
+    Return the header and the exchanges of a traffic log.
+
+    A log is a series of gzip members, possibly from several processes. A
+    member cut short by a crash ends the log; what was read before it is
+    kept.
+    """
+    header: Dict = {}
+    entries: List[Dict] = []
+    with gzip.open(path, "rt", encoding="utf-8") as log:
+        try:
+            for line in log:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get("type") == "header":
+                    header = header or record
+                else:
+                    entries.append(record)
+        except (EOFError, gzip.BadGzipFile, json.JSONDecodeError) as e:
+            logger.warning("Traffic log %s is truncated after %s exchanges: %s", path, len(entries), e)
+    return header, entries
+
+
+class TrafficLogWriter:
+    """
+    Appends anonymized exchanges to a traffic log.
+
+    Records are buffered and appended as a complete gzip member every
+    ``flush_every`` records and on close, so a crash loses at most one
+    buffer rather than the whole file. Each member is written with a
+    single ``O_APPEND`` write under an exclusive file lock, so several
+    worker processes can share one log; the header is written once, by
+    whichever process finds the file empty.
+
+    ``key`` should come from a secret shared by every run (and worker)
+    whose logs are compared; without one a random key is used, and
+    fingerprints only match within this process. Recording never raises:
+    a failed write is logged and the request carries on.
+    """
+
+    def __init__(self, path: str, key: Optional[str] = None, flush_every: int = 20):
+        self.path = path
+        if not key:
+            logger.warning("No traffic log key set; request fingerprints will not match across runs")
+        self.key = key.encode("utf-8") if key else secrets.token_bytes(32)
+        self.key_id = key_id(self.key)
+        self.flush_every = max(1, flush_every)
+        self.recorded = 0
+        self._buffer: List[str] = []
+        self._checked = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _line(record: Dict) -> str:
+        return json.dumps(record, separators=(",", ":")) + "\n"
+
+    def _append(self, lines: List[str]) -> None:
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            if os.fstat(fd).st_size == 0:
+                lines = [self._line({"type": "header", "version": FORMAT_VERSION, "key_id": self.key_id,
+                                     "created_at": time.time()})] + lines
+            elif not self._checked:
+                header, _ = read_log(self.path)
+                if header.get("key_id") != self.key_id:
+                    logger.warning("Appending to %s recorded with a different key; fingerprints will not match",
+                                   self.path)
+            self._checked = True
+            os.write(fd, gzip.compress("".join(lines).encode("utf-8")))
+        finally:
+            os.close(fd)
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        self._append(lines)
+
+    def record(self, payload: Dict, status: int, latency_ms: Optional[float],
+               response: Optional[Dict] = None, retry_after: Optional[float] = None) -> None:
+        try:
+            with self._lock:
+                entry = {
+                    "type": "exchange",
+                    "t": round(time.time(), 3),
+                    "key": fingerprint(payload, self.key),
+                    "model": payload.get("model"),
+                    "status": status,
+                    "latency_ms": round(latency_ms, 1) if latency_ms is not None else None,
+                    "request": payload_shape(payload)
+                }
+                if retry_after is not None:
+                    entry["retry_after"] = retry_after
+                if response is not None:
+                    choice = (response.get("choices") or [{}])[0]
+                    entry["response"] = {
+                        "content": anonymize_text(choice.get("message", {}).get("content") or "", self.key),
+                        "finish_reason": choice.get("finish_reason"),
+                        "usage": response.get("usage", {})
+                    }
+                self._buffer.append(self._line(entry))
+                self.recorded += 1
+                if len(self._buffer) >= self.flush_every:
+                    self._flush()
+        except Exception as e:
+            logger.warning("Failed to record upstream exchange to %s: %s", self.path, e)
+
+    def close(self) -> None:
+        try:
+            with self._lock:
+                self._flush()
+        except Exception as e:
+            logger.warning("Failed to flush upstream traffic log %s: %s", self.path, e)
+
+
+class TrafficReplay:
+    """
+    Serves recorded exchanges in place of the upstream API.
+
+    A request is matched to a recording with the same fingerprint first,
+    then to the next recording for the same model, then to the next
+    recording of any model; each pool is cycled so a short log can drive a
+    long run. Fingerprints are only compared when ``key`` is the one the
+    log was recorded with. ``speed`` scales the recorded latencies (2.0 =
+    twice as slow).
+    """
+
+    def __init__(self, path: str, key: Optional[str] = None, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        header, entries = read_log(path)
+        if not entries:
+            raise ValueError(f"Traffic log {path} has no recorded exchanges")
+        self.key = key.encode("utf-8") if key else None
+        if self.key is not None and header.get("key_id") != key_id(self.key):
+            logger.warning("Traffic log %s was recorded with a different key; matching by model only", path)
+            self.key = None
+        self._by_key: Dict[str, Deque[Dict]] = {}
+        self._by_model: Dict[str, Deque[Dict]] = {}
+        self._all: Deque[Dict] = deque(entries)
+        for entry in entries:
+            self._by_key.setdefault(entry["key"], deque()).append(entry)
+            self._by_model.setdefault(entry["model"], deque()).append(entry)
+        self._lock = threading.Lock()
+        self.served = {"key": 0, "model": 0, "any": 0}
+
+    @staticmethod
+    def _next(pool: Deque[Dict]) -> Dict:
+        entry = pool.popleft()
+        pool.append(entry)
+        return entry
+
+    def match(self, payload: Dict) -> Dict:
+        key = fingerprint(payload, self.key) if self.key is not None else None
+        with self._lock:
+            for kind, pool in (("key", self._by_key.get(key)),
+                               ("model", self._by_model.get(payload.get("model"))),
+                               ("any", self._all)):
+                if pool:
+                    self.served[kind] += 1
+                    return self._next(pool)
+        raise LookupError("No recorded exchange to replay")
+
+    def delay_s(self, entry: Dict) -> float:
+        return max(0.0, (entry.get("latency_ms") or 0.0) * self.speed / 1000)
+
+    @staticmethod
+    def response_body(entry: Dict, payload: Dict) -> Dict:
+        """Rebuild a chat-completions response from a recorded exchange."""
+        response = entry.get("response") or {}
+        return {
+            "id": "chatcmpl-replay",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": response.get("content", "")},
+                "finish_reason": response.get("finish_reason", "stop")
+            }],
+            "usage": response.get("usage", {})
+        }
@@ -1,6 +1,7 @@
 import re
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -19,15 +20,22 @@ class RequestValidator:
         
         # Check model
         model = data.get('model', 'llama3-8b')
-        from config import Config
-        if model not in Config.AVAILABLE_MODELS:
-            errors.append(f"Invalid model. Available models: {list(Config.AVAILABLE_MODELS.keys())}")
+        if not RequestValidator.is_valid_model(model):
+            errors.append(f"Invalid model. Available models: {list(Config.MODEL_KEYS) + [Config.AUTO_MODEL]}")
+
+        # Check routing options (only used with model "auto")
+        tier, latency_slo_ms, routing_errors = RequestValidator.parse_routing_options(data)
+        errors.extend(routing_errors)
         
         # Check mode
         mode = data.get('mode', 'basic')
         if mode not in ['basic', 'pro']:
             errors.append("Mode must be either 'basic' or 'pro'")
         
+        # Check pro mode options
+        perspectives, perspective_model, pro_errors = RequestValidator.parse_pro_mode_options(data)
+        errors.extend(pro_errors)
+        
         # Check context (optional)
         context = data.get('context', '')
         if context and len(context) > 8000:
@@ -40,13 +48,67 @@ class RequestValidator:
             'message': message,
             'model': model,
             'mode': mode,
-            'context': context if context else None
+            'context': context if context else None,
+            'tier': tier,
+            'latency_slo_ms': latency_slo_ms,
+            'perspectives': perspectives,
+            'perspective_model': perspective_model
         }
+
+    @staticmethod
+    def is_valid_model(model: str) -> bool:
+        """Check that model is a known model key or the automatic router."""
+        return model in Config.SELECTABLE_MODELS
+
+    @staticmethod
+    def parse_routing_options(data: Dict[str, Any]) -> Tuple[Optional[str], Optional[float], List[str]]:
+        """Read the optional "tier" and "latency_slo_ms" routing fields."""
+        errors = []
+
+        tier = data.get('tier')
+        if tier is not None and tier not in Config.ROUTING_TIERS:
+            errors.append(f"Tier must be one of: {list(Config.ROUTING_TIERS.keys())}")
+
+        latency_slo_ms = data.get('latency_slo_ms')
+        if latency_slo_ms is not None and latency_slo_ms != '':
+            try:
+                latency_slo_ms = float(latency_slo_ms)
+                if latency_slo_ms <= 0:
+                    raise ValueError
+            except (TypeError, ValueError):
+                errors.append("latency_slo_ms must be a positive number")
+                latency_slo_ms = None
+        else:
+            latency_slo_ms = None
+
+        return tier, latency_slo_ms, errors
     
+    @staticmethod
+    def parse_pro_mode_options(data: Dict[str, Any]) -> Tuple[Optional[int], Optional[str], List[str]]:
+        """Read the optional "perspectives" and "perspective_model" pro mode fields."""
+        errors = []
+
+        perspectives = data.get('perspectives')
+        if perspectives is not None and perspectives != '':
+            try:
+                perspectives = int(perspectives)
+                if not 1 <= perspectives <= Config.PRO_MODE_MAX_QUERIES:
+                    raise ValueError
+            except (TypeError, ValueError):
+                errors.append(f"perspectives must be an integer between 1 and {Config.PRO_MODE_MAX_QUERIES}")
+                perspectives = None
+        else:
+            perspectives = None
+
+        perspective_model = data.get('perspective_model') or None
+        if perspective_model is not None and perspective_model not in Config.AVAILABLE_MODELS:
+            errors.append(f"Invalid perspective_model. Available models: {list(Config.MODEL_KEYS)}")
+
+        return perspectives, perspective_model, errors
+
     @staticmethod
     def validate_groq_api_key() -> bool:
         """Validate that Groq API key is available."""
-        from config import Config
         api_key = Config.GROQ_API_KEY
         
         if not api_key: